@@ -0,0 +1,84 @@
+""" Benchmarks for the scheduling hot paths of the mscheduler module """
+
+__author__ = "Andreas Werdich"
+__copyright__ = "Core for Computational Biomedicine at Harvard Medical School"
+__license__ = "CC0-1.0"
+
+import pandas as pd
+import pytest
+from cadence.mscheduler import Meetings
+from conftest import fake_roster
+
+START_DATE = '2025-01-01'
+
+
+def make_meetings(n_members: int) -> Meetings:
+    """ Meetings instance for a seeded fake roster """
+    roster = fake_roster(n_members)
+    return Meetings(name_list=list(roster['name'].values), group_list=list(roster['group'].values))
+
+
+def end_date(years: int) -> str:
+    return str((pd.Timestamp(START_DATE) + pd.DateOffset(years=years)).date())
+
+
+@pytest.mark.benchmark(group='create_timeboard')
+@pytest.mark.parametrize('engine', ['timeboard', 'numpy'])
+@pytest.mark.parametrize('years', [1, 5, 10, 20])
+def bench_create_timeboard(benchmark, years, engine):
+    meet = make_meetings(50)
+    benchmark(meet.create_timeboard, start_date=START_DATE, end_date=end_date(years), engine=engine)
+
+
+@pytest.mark.benchmark(group='skip')
+@pytest.mark.parametrize('n_skips', [1, 10])
+def bench_skip_date_chain(benchmark, n_skips):
+    meet = make_meetings(50)
+    cal = meet.create_timeboard(start_date=START_DATE, end_date=end_date(2))
+    dates = cal['date'].iloc[5::10].iloc[:n_skips]
+
+    def chain_skips():
+        cal_skip = cal
+        for date in dates:
+            cal_skip = meet.skip_date(cal_df=cal_skip, date=date, comment='skip')
+        return cal_skip
+    benchmark(chain_skips)
+
+
+@pytest.mark.benchmark(group='skip')
+@pytest.mark.parametrize('n_skips', [1, 10])
+def bench_skip_dates(benchmark, n_skips):
+    meet = make_meetings(50)
+    cal = meet.create_timeboard(start_date=START_DATE, end_date=end_date(2))
+    skips = [(date, 'skip') for date in cal['date'].iloc[5::10].iloc[:n_skips]]
+    benchmark(meet.skip_dates, cal_df=cal, skips=skips)
+
+
+@pytest.mark.benchmark(group='swap')
+def bench_swap_dates(benchmark):
+    meet = make_meetings(50)
+    cal = meet.create_timeboard(start_date=START_DATE, end_date=end_date(20))
+    benchmark(meet.swap_dates, cal_df=cal, date_1=cal['date'].iloc[10], date_2=cal['date'].iloc[-10])
+
+
+@pytest.mark.benchmark(group='swap')
+def bench_swap_many(benchmark):
+    meet = make_meetings(50)
+    cal = meet.create_timeboard(start_date=START_DATE, end_date=end_date(20))
+    pairs = list(zip(cal['date'].iloc[10:110], cal['date'].iloc[-110:-10]))
+    benchmark(meet.swap_many, cal_df=cal, pairs=pairs)
+
+
+@pytest.mark.benchmark(group='merge_lists')
+@pytest.mark.parametrize('n_members', [10, 1000, 100000])
+def bench_merge_lists(benchmark, n_members):
+    roster = fake_roster(n_members)
+    list_of_lists = [list(names) for _, names in roster.groupby('group')['name']]
+    benchmark(Meetings.merge_lists, list_of_lists)
+
+
+@pytest.mark.benchmark(group='create_name_sequence')
+@pytest.mark.parametrize('n_members', [10, 1000, 100000])
+def bench_create_name_sequence(benchmark, n_members):
+    meet = make_meetings(n_members)
+    benchmark(meet.create_name_sequence)
@@ -0,0 +1,23 @@
+""" Benchmarks for the utils module """
+
+__author__ = "Andreas Werdich"
+__copyright__ = "Core for Computational Biomedicine at Harvard Medical School"
+__license__ = "CC0-1.0"
+
+import pytest
+from cadence.utils import GroupFaker
+from conftest import SEED
+
+
+@pytest.mark.benchmark(group='group_faker')
+@pytest.mark.parametrize('n_members', [100, 10000])
+def bench_create_fake_research_group(benchmark, n_members):
+    gf = GroupFaker(n_members=n_members, n_groups=10, seed=SEED)
+    benchmark.pedantic(gf.create_fake_research_group, rounds=3, iterations=1)
+
+
+@pytest.mark.benchmark(group='group_faker')
+@pytest.mark.parametrize('n_members', [10000, 1000000])
+def bench_create_bulk_research_group(benchmark, n_members):
+    gf = GroupFaker(n_members=n_members, n_groups=10, seed=SEED)
+    benchmark.pedantic(gf.create_bulk_research_group, rounds=3, iterations=1)
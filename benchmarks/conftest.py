@@ -0,0 +1,25 @@
+"""
+Shared rosters for the benchmarks
+Core for Computational Biomedicine at Harvard Medical School
+"""
+
+from functools import lru_cache
+from cadence.utils import GroupFaker
+
+__author__ = "Andreas Werdich"
+__copyright__ = "Core for Computational Biomedicine at Harvard Medical School"
+__license__ = "CC0-1.0"
+
+SEED = 123
+
+@lru_cache(maxsize=None)
+def fake_roster(n_members: int, n_groups=5):
+    """
+    Seeded fake research group, created once per size.
+    Faker repeats names in large groups, so only the first member with each name is kept.
+    :param n_members: number of members
+    :param n_groups: number of groups
+    :return: DataFrame from GroupFaker.create_fake_research_group
+    """
+    roster = GroupFaker(n_members=n_members, n_groups=n_groups, seed=SEED).create_fake_research_group()
+    return roster.drop_duplicates(subset='name').reset_index(drop=True)
@@ -1,2 +1 @@
-def main() -> None:
-    print("Hello from cadence!")
+from cadence.cli import main
@@ -0,0 +1,124 @@
+"""
+Command line interface for creating meeting schedules
+Core for Computational Biomedicine at Harvard Medical School
+Created in 2024 by Andreas Werdich
+
+This module only imports the standard library at import time.
+The scheduling code with pandas and numpy is imported after the arguments are parsed,
+so that `cadence --help` starts fast. With a manifest file,
+many schedules are created in one process and the imports are needed only once.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+JOB_KEYS = ['names', 'groups', 'start', 'end', 'start_name', 'meeting_day', 'engine', 'output']
+
+def split_names(names) -> list:
+    """
+    Splits a string of names, separated by commas.
+
+    :param names: A string of names separated by commas, or a list of names.
+    :return: A list of names without leading or trailing spaces.
+    """
+    if isinstance(names, str):
+        names = names.split(',')
+    return [str(name).strip() for name in names]
+
+def load_manifest(manifest_file: str) -> list:
+    """
+    Loads the schedule jobs from a manifest file.
+
+    :param manifest_file: Path to a .csv, .yaml or .yml file.
+    :return: A list of job dictionaries with the keys in JOB_KEYS.
+
+    A CSV manifest has one job per row and a header with the job keys.
+    Names and groups are separated by commas within their fields.
+    A YAML manifest is a list of jobs, or a dictionary with the list of jobs under the key 'jobs'.
+    Reading YAML files requires the PyYAML package.
+    """
+    xt = os.path.splitext(manifest_file)[-1].lower()
+    if xt == '.csv':
+        with open(manifest_file, newline='') as fl:
+            jobs = [{key: val for key, val in row.items() if val not in [None, '']} for row in csv.DictReader(fl)]
+    elif xt in ['.yaml', '.yml']:
+        try:
+            import yaml
+        except ImportError as e:
+            raise ImportError('Reading YAML manifest files requires the PyYAML package. '
+                              'Install cadence with the yaml extra: pip install "cadence[yaml]"') from e
+        with open(manifest_file) as fl:
+            jobs = yaml.safe_load(fl) or []
+        if isinstance(jobs, dict):
+            jobs = jobs.get('jobs', [])
+    else:
+        raise ValueError(f'Unknown manifest file extension {xt}. Use .csv, .yaml or .yml.')
+    for idx, job in enumerate(jobs):
+        unknown = [key for key in job if key not in JOB_KEYS]
+        if len(unknown) > 0:
+            raise ValueError(f'Job {idx} in {manifest_file} has unknown keys: {", ".join(unknown)}.')
+        missing = [key for key in ['names', 'start', 'end'] if key not in job]
+        if len(missing) > 0:
+            raise ValueError(f'Job {idx} in {manifest_file} is missing keys: {", ".join(missing)}.')
+    return jobs
+
+def run_job(job: dict):
+    """
+    Creates the schedule for one job and writes it to the output file of the job.
+
+    :param job: A job dictionary with the keys in JOB_KEYS.
+    :return: The schedule DataFrame.
+    """
+    from cadence.mscheduler import Meetings
+    groups = job.get('groups')
+    meet = Meetings(name_list=split_names(job.get('names')),
+                    group_list=split_names(groups) if groups is not None else None)
+    if groups is not None:
+        meet.create_name_sequence()
+    cal = meet.create_timeboard(start_date=str(job.get('start')),
+                                end_date=str(job.get('end')),
+                                start_name=job.get('start_name'),
+                                meeting_day=int(job.get('meeting_day', 2)),
+                                engine=job.get('engine', 'numpy'))
+    output = job.get('output')
+    if output is not None:
+        from cadence.export import write_schedule
+        write_schedule(cal, output)
+        logger.info(f'Saved schedule: {output}')
+    return cal
+
+def build_parser() -> argparse.ArgumentParser:
+    """ Returns the argument parser of the command line interface """
+    msg = 'Create a meeting schedule from a list of names.'
+    parser = argparse.ArgumentParser(prog='cadence', description=msg)
+    parser.add_argument('-n', '--names', help='"names, separated by commas"')
+    parser.add_argument('-g', '--groups', help='"groups of the names, separated by commas"')
+    parser.add_argument('-s', '--start', help='start date (str)')
+    parser.add_argument('-e', '--end', help='end date (str)')
+    parser.add_argument('--start-name', help='name of the first presenter')
+    parser.add_argument('-d', '--meeting-day', type=int, default=2, help='day of the week, Monday is 0 (default: 2)')
+    parser.add_argument('--engine', default='numpy', choices=['numpy', 'timeboard'],
+                        help='schedule engine (default: numpy)')
+    parser.add_argument('-o', '--output', help='output .csv, .ics, .parquet or .arrow file (default: print the schedule)')
+    parser.add_argument('-m', '--manifest', help='.csv or .yaml file with a list of schedule jobs')
+    return parser
+
+def main(argv=None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.manifest is not None:
+        jobs = load_manifest(args.manifest)
+    elif args.names is not None and args.start is not None and args.end is not None:
+        jobs = [{key: val for key, val in vars(args).items() if key in JOB_KEYS and val is not None}]
+    else:
+        parser.error('Use --names, --start and --end, or --manifest.')
+    for job in jobs:
+        cal = run_job(job)
+        if job.get('output') is None:
+            # Print the schedule if there is no output file
+            print(cal)
@@ -0,0 +1,263 @@
+"""
+Writers for meeting schedules in the iCalendar, Parquet and Arrow IPC formats
+Core for Computational Biomedicine at Harvard Medical School
+Created in 2024 by Andreas Werdich
+
+The writers accept a schedule DataFrame, an iterable of DataFrames such as the chunks of chunk_schedule,
+or an iterable of ScheduleRecord from Meetings.iter_schedule.
+They write one chunk at a time, so the memory use does not depend on the length of the schedule.
+"""
+from __future__ import annotations
+
+import datetime
+import hashlib
+import logging
+import os
+from itertools import chain
+import numpy as np
+import pandas as pd
+from cadence.mscheduler import chunk_schedule
+
+logger = logging.getLogger(__name__)
+
+EXPORT_EXT_LIST = ['.csv', '.ics', '.parquet', '.arrow']
+
+def standard_dates(cal_df: pd.DataFrame, date_col='date') -> pd.DataFrame:
+    """
+    Converts the day offsets of a compact schedule from Meetings.to_compact back to dates.
+
+    :param cal_df: A schedule DataFrame.
+    :param date_col: The date column. Default is 'date'.
+    :return: The DataFrame with datetime64 dates. Other columns, such as categorical names, are kept.
+
+    DataFrames with dates that are not integers are returned as they are.
+    Integer dates without the epoch in the attrs of the DataFrame raise a ValueError.
+    """
+    if date_col not in cal_df.columns or not pd.api.types.is_integer_dtype(cal_df[date_col]):
+        return cal_df
+    epoch = cal_df.attrs.get('epoch')
+    if epoch is None:
+        raise ValueError(f'The dates in column {date_col} are integers, but the schedule has no epoch. '
+                         'Use a schedule from create_timeboard or to_compact.')
+    dates = pd.Timestamp(epoch) + pd.to_timedelta(cal_df[date_col].to_numpy(dtype=np.int64), unit='D')
+    cal_df = cal_df.assign(**{date_col: dates.astype('datetime64[ns]')})
+    cal_df.attrs = {}
+    return cal_df
+
+def iter_chunks(schedule, chunk_size=1000, date_col='date'):
+    """
+    Splits a schedule into DataFrames.
+
+    :param schedule: A DataFrame, an iterable of DataFrames or an iterable of ScheduleRecord.
+                     DataFrames in the compact layout of Meetings.to_compact are converted with standard_dates.
+    :param chunk_size: The number of rows of each DataFrame for a DataFrame or records. Default is 1000.
+    :param date_col: The date column. Default is 'date'.
+    :return: A generator of DataFrames.
+    """
+    if isinstance(schedule, pd.DataFrame):
+        for start in range(0, len(schedule), chunk_size):
+            chunk = schedule.iloc[start:start + chunk_size]
+            chunk.attrs = dict(schedule.attrs)
+            yield standard_dates(chunk, date_col=date_col)
+        return
+    schedule = iter(schedule)
+    first = next(schedule, None)
+    if first is None:
+        return
+    if isinstance(first, pd.DataFrame):
+        for chunk in chain([first], schedule):
+            yield standard_dates(chunk, date_col=date_col)
+    else:
+        yield from chunk_schedule(chain([first], schedule), chunk_size=chunk_size)
+
+def _ics_text(text) -> str:
+    """ Escapes a text value of an iCalendar property """
+    return str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+def _ics_line(line: str) -> str:
+    """ Folds an iCalendar content line into lines of at most 75 octets, with CRLF line breaks """
+    data = line.encode('utf-8')
+    parts, start, limit = [], 0, 75
+    while len(data) - start > limit:
+        end = start + limit
+        # Do not split a multi-byte character
+        while (data[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(data[start:end].decode('utf-8'))
+        # Lines after the first start with a space, so they hold 74 octets of the content
+        start, limit = end, 74
+    parts.append(data[start:].decode('utf-8'))
+    return '\r\n '.join(parts) + '\r\n'
+
+def write_ics(schedule, file, calendar_name='Meetings', chunk_size=1000, date_col='date', name_col='name',
+              group_col='group', comment_col='comment') -> int:
+    """
+    Writes a schedule as an iCalendar file with one all-day event for each meeting.
+
+    :param schedule: A schedule, see :func:`iter_chunks`.
+    :param file: Path of the .ics file or a text file object.
+    :param calendar_name: The name of the calendar. Default is 'Meetings'.
+    :param chunk_size: The number of rows that are converted at a time. Default is 1000.
+    :param date_col: The date column. Default is 'date'.
+    :param name_col: The name column, which is the summary of the events. Default is 'name'.
+    :param group_col: The group column, which is added to the description of the events. Default is 'group'.
+    :param comment_col: The comment column, which is added to the description of the events. Default is 'comment'.
+    :return: The number of events.
+
+    The events are written row by row. Their UIDs are derived from the date, name and row number,
+    so that writing the same schedule again updates the events in a calendar application.
+    """
+    if not hasattr(file, 'write'):
+        with open(file, 'w', newline='', encoding='utf-8') as fl:
+            return write_ics(schedule, fl, calendar_name=calendar_name, chunk_size=chunk_size, date_col=date_col,
+                             name_col=name_col, group_col=group_col, comment_col=comment_col)
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    file.write(''.join(_ics_line(line) for line in ['BEGIN:VCALENDAR',
+                                                    'VERSION:2.0',
+                                                    'PRODID:-//CCB//cadence//EN',
+                                                    'CALSCALE:GREGORIAN',
+                                                    f'X-WR-CALNAME:{_ics_text(calendar_name)}']))
+    n_events = 0
+    for chunk in iter_chunks(schedule, chunk_size=chunk_size, date_col=date_col):
+        dates = pd.to_datetime(chunk[date_col])
+        start = dates.dt.strftime('%Y%m%d').tolist()
+        end = (dates + pd.Timedelta(days=1)).dt.strftime('%Y%m%d').tolist()
+        empty = [None] * len(chunk)
+        groups = chunk[group_col].tolist() if group_col in chunk.columns else empty
+        comments = chunk[comment_col].tolist() if comment_col in chunk.columns else empty
+        for dt_start, dt_end, name, group, comment in zip(start, end, chunk[name_col].tolist(), groups, comments):
+            uid = hashlib.sha1(f'{dt_start}|{name}|{n_events}'.encode()).hexdigest()
+            description = [f'{label}: {val}' for label, val in [('Group', group), ('Comment', comment)]
+                           if not pd.isna(val)]
+            lines = ['BEGIN:VEVENT',
+                     f'UID:{uid}@cadence',
+                     f'DTSTAMP:{stamp}',
+                     f'DTSTART;VALUE=DATE:{dt_start}',
+                     f'DTEND;VALUE=DATE:{dt_end}',
+                     f'SUMMARY:{_ics_text(name)}']
+            if len(description) > 0:
+                lines.append(f'DESCRIPTION:{_ics_text(chr(10).join(description))}')
+            lines.append('END:VEVENT')
+            file.write(''.join(_ics_line(line) for line in lines))
+            n_events += 1
+    file.write(_ics_line('END:VCALENDAR'))
+    return n_events
+
+class _ChunkConverter:
+    """
+    Converts DataFrame chunks into Arrow tables with the same schema.
+    The categories of the categorical columns only grow from chunk to chunk,
+    so that the dictionaries of later chunks extend the dictionaries of earlier chunks.
+    """
+    def __init__(self, categorical=None):
+        self.categorical = list(categorical or [])
+        self.categories = {}
+        self.schema = None
+
+    def table(self, chunk: pd.DataFrame):
+        import pyarrow as pa
+        columns = {}
+        for col in chunk.columns:
+            if col not in self.categorical and not isinstance(chunk[col].dtype, pd.CategoricalDtype):
+                continue
+            values = chunk[col] if isinstance(chunk[col].dtype, pd.CategoricalDtype) else chunk[col].astype('category')
+            categories = self.categories.setdefault(col, pd.Index(values.cat.categories))
+            new = values.cat.categories.difference(categories, sort=False)
+            if len(new) > 0:
+                categories = self.categories[col] = categories.append(new)
+            columns[col] = values.cat.set_categories(categories)
+        chunk = chunk.assign(**columns)
+        if self.schema is None:
+            schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            # Columns without values in the first chunk, such as the comments, are strings
+            for idx, fld in enumerate(schema):
+                if pa.types.is_null(fld.type):
+                    schema = schema.set(idx, fld.with_type(pa.string()))
+            self.schema = schema
+        return pa.Table.from_pandas(chunk, schema=self.schema, preserve_index=False)
+
+def write_parquet(schedule, file, categorical=None, chunk_size=1000, date_col='date') -> int:
+    """
+    Writes a schedule to a Parquet file, one row group for each chunk.
+
+    :param schedule: A schedule, see :func:`iter_chunks`.
+    :param file: Path of the .parquet file.
+    :param categorical: Columns to store as categorical columns, in addition to the categorical columns of the schedule.
+    :param chunk_size: The number of rows of each row group for a DataFrame or records. Default is 1000.
+    :param date_col: The date column. Default is 'date'.
+    :return: The number of rows.
+
+    Categorical and datetime columns are restored by pd.read_parquet.
+    """
+    import pyarrow.parquet as pq
+    converter = _ChunkConverter(categorical=categorical)
+    writer, n_rows = None, 0
+    try:
+        for chunk in iter_chunks(schedule, chunk_size=chunk_size, date_col=date_col):
+            table = converter.table(chunk)
+            if writer is None:
+                writer = pq.ParquetWriter(file, table.schema)
+            writer.write_table(table)
+            n_rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        logger.warning(f'Schedule is empty, no file written: {file}')
+    return n_rows
+
+def write_arrow(schedule, file, categorical=None, chunk_size=1000, date_col='date') -> int:
+    """
+    Writes a schedule to an Arrow IPC file, one record batch for each chunk.
+
+    :param schedule: A schedule, see :func:`iter_chunks`.
+    :param file: Path of the .arrow file.
+    :param categorical: Columns to store as categorical columns, in addition to the categorical columns of the schedule.
+    :param chunk_size: The number of rows of each record batch for a DataFrame or records. Default is 1000.
+    :param date_col: The date column. Default is 'date'.
+    :return: The number of rows.
+
+    The file can be read with pyarrow.ipc.open_file(file).read_pandas() or pd.read_feather.
+    New categories in later chunks are written as dictionary deltas.
+    """
+    import pyarrow as pa
+    converter = _ChunkConverter(categorical=categorical)
+    options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+    writer, n_rows = None, 0
+    try:
+        for chunk in iter_chunks(schedule, chunk_size=chunk_size, date_col=date_col):
+            table = converter.table(chunk)
+            if writer is None:
+                writer = pa.ipc.new_file(file, table.schema, options=options)
+            writer.write_table(table)
+            n_rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        logger.warning(f'Schedule is empty, no file written: {file}')
+    return n_rows
+
+def write_schedule(schedule, file, **kwargs) -> int:
+    """
+    Writes a schedule in the format of the file extension.
+
+    :param schedule: A schedule, see :func:`iter_chunks`.
+    :param file: Path of a .csv, .ics, .parquet or .arrow file.
+    :param kwargs: Other arguments of the writer.
+    :return: The number of rows.
+    """
+    xt = os.path.splitext(file)[-1].lower()
+    if xt == '.ics':
+        return write_ics(schedule, file, **kwargs)
+    if xt == '.parquet':
+        return write_parquet(schedule, file, **kwargs)
+    if xt == '.arrow':
+        return write_arrow(schedule, file, **kwargs)
+    if xt == '.csv':
+        n_rows = 0
+        for idx, chunk in enumerate(iter_chunks(schedule, **kwargs)):
+            chunk.to_csv(file, index=False, mode='w' if idx == 0 else 'a', header=idx == 0)
+            n_rows += len(chunk)
+        return n_rows
+    raise ValueError(f'Unknown output file extension {xt}. Use {", ".join(EXPORT_EXT_LIST)}.')
@@ -5,14 +5,21 @@ Created in 2024 by Andreas Werdich
 """
 from __future__ import annotations
 
-import argparse
+import numpy as np
 import pandas as pd
-import timeboard as tb
-import holidays
+import contextlib
+import hashlib
+import heapq
+import json
 import logging
-import operator
-from functools import reduce
-from itertools import chain
+import time
+import tracemalloc
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+from functools import lru_cache
+from itertools import chain, islice
+from typing import NamedTuple
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +68,383 @@ def in_list(lst: list, elements: list) -> bool:
     check_lst = [True if el in lst else False for el in elements]
     return all(check_lst)
 
+def interleave(names: list, groups: list, fill='append') -> list:
+    """
+    Interleaves names from different groups in round-robin order.
+
+    :param names: The list of names.
+    :param groups: The group of each name. The groups take turns in the order of their first appearance.
+    :param fill: Policy for groups of unequal size. 'append' (default) interleaves the groups
+                 as long as all of them have members and adds the remaining names at the end, group by group.
+                 'cycle' keeps interleaving the groups that still have members.
+    :return: The interleaved list of names.
+
+    Example:
+        names = ['a1', 'a2', 'a3', 'b1', 'c1', 'c2']
+        groups = ['a', 'a', 'a', 'b', 'c', 'c']
+        interleave(names, groups, fill='append')
+        # result = ['a1', 'b1', 'c1', 'a2', 'a3', 'c2']
+        interleave(names, groups, fill='cycle')
+        # result = ['a1', 'b1', 'c1', 'a2', 'c2', 'a3']
+    """
+    if fill not in ['append', 'cycle']:
+        raise ValueError(f'Unknown fill policy "{fill}". Use "append" or "cycle".')
+    if len(names) == 0:
+        return []
+    # Group number in order of appearance and position of each name within its group
+    codes = pd.factorize(pd.Series(groups, dtype=object), use_na_sentinel=False)[0]
+    rank = pd.Series(codes).groupby(codes).cumcount().values
+    if fill == 'cycle':
+        order = np.lexsort((codes, rank))
+    else:
+        n_rounds = np.bincount(codes).min()
+        in_rounds = rank < n_rounds
+        order = np.flatnonzero(in_rounds)
+        order = order[np.lexsort((codes[order], rank[order]))]
+        remaining = np.flatnonzero(~in_rounds)
+        remaining = remaining[np.lexsort((rank[remaining], codes[remaining]))]
+        # Names that are already in the interleaved rounds are not added again
+        merged_names = {names[idx] for idx in order}
+        order = list(order) + [idx for idx in remaining if names[idx] not in merged_names]
+    return [names[idx] for idx in order]
+
+def meeting_dates(start_date, end_date, meeting_day=2) -> np.ndarray:
+    """
+    Computes the meeting dates between two dates with numpy datetime64 arithmetic.
+
+    The dates follow the layout of the timeboard organizer used in :meth:`Meetings.create_timeboard`:
+    the first meeting falls on `start_date`, followed by every `meeting_day` weekday after it up to
+    and including `end_date`. Meeting days outside of 0 (Monday) to 6 (Sunday) leave only the start date.
+
+    :param start_date: The start date of the schedule.
+    :param end_date: The end date of the schedule.
+    :param meeting_day: The day of the week for the meetings (default is Wednesday, represented by 2).
+    :return: A numpy array of datetime64[D] meeting dates.
+    """
+    start = pd.Timestamp(start_date).to_datetime64().astype('datetime64[D]')
+    end = pd.Timestamp(end_date).to_datetime64().astype('datetime64[D]')
+    if end < start:
+        raise ValueError(f'Start date {start_date} must precede end date {end_date}.')
+    dates = np.array([start])
+    if 0 <= meeting_day <= 6:
+        # 1970-01-01 was a Thursday, so day 0 of the epoch has weekday 3
+        weekday = (start.astype(np.int64) + 3) % 7
+        first = start + np.timedelta64((meeting_day - weekday) % 7 or 7, 'D')
+        weekly = np.arange(first, end + np.timedelta64(1, 'D'), np.timedelta64(7, 'D'))
+        dates = np.concatenate([dates, weekly])
+    return dates
+
+class HolidayIndex(NamedTuple):
+    """
+    Sorted holiday dates with their names for vectorized lookups.
+
+    Attributes:
+        dates (np.ndarray): Sorted datetime64[D] holiday dates.
+        names (np.ndarray): The holiday names for the dates.
+    """
+    dates: np.ndarray
+    names: np.ndarray
+
+    def lookup(self, dates) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Looks up the holidays for an array of dates.
+
+        :param dates: An array-like of dates.
+        :return: A boolean holiday flag array and an object array with the holiday names (None for other days).
+        """
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        flag = np.zeros(len(dates), dtype=bool)
+        comment = np.full(len(dates), None, dtype=object)
+        if len(self.dates) > 0:
+            pos = np.minimum(np.searchsorted(self.dates, dates), len(self.dates) - 1)
+            flag = self.dates[pos] == dates
+            comment[flag] = self.names[pos[flag]]
+        return flag, comment
+
+@lru_cache(maxsize=64)
+def holiday_index(years: tuple, country='US', subdiv='MA') -> HolidayIndex:
+    """
+    Builds the holiday index for a country and subdivision.
+    The index is cached, so it is created only once for each (years, country, subdiv) combination.
+
+    :param years: Tuple with the first and the last year of the index.
+    :param country: ISO country code for the holidays library (default is 'US').
+    :param subdiv: The subdivision of the country (default is 'MA'), or None.
+    :return: The HolidayIndex.
+    """
+    # The holidays library is only imported when the holidays are needed
+    import holidays
+    first_year, last_year = years
+    country_holidays = holidays.country_holidays(country, subdiv=subdiv, years=range(first_year, last_year + 1))
+    items = sorted(country_holidays.items())
+    dates = np.array([dt for dt, _ in items], dtype='datetime64[D]')
+    names = np.array([name for _, name in items], dtype=object)
+    return HolidayIndex(dates=dates, names=names)
+
+class ScheduleRecord(NamedTuple):
+    """ One meeting of a schedule, as yielded by :meth:`Meetings.iter_schedule` """
+    date: pd.Timestamp
+    name: str
+    group: str
+    holiday: bool
+    comment: str
+
+def chunk_schedule(records, chunk_size=1000):
+    """
+    Converts schedule records into DataFrames of a fixed number of rows.
+
+    :param records: An iterable of ScheduleRecord, for example from Meetings.iter_schedule.
+    :param chunk_size: The number of rows of each DataFrame. Default is 1000.
+    :return: A generator of DataFrames with the date, name, group, holiday and comment columns.
+
+    Example:
+        records = meet.iter_schedule(start_date='2025-01-01')
+        for cal in chunk_schedule(islice(records, 520), chunk_size=52):
+            ...
+    """
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if len(chunk) == 0:
+            return
+        cal = pd.DataFrame(chunk, columns=list(ScheduleRecord._fields))
+        yield cal.astype({'date': 'datetime64[ns]', 'holiday': bool})
+
+@dataclass
+class ScheduleState:
+    """
+    Serializable rotation state of a meeting schedule.
+
+    Attributes:
+        names (list): The roster in the order of the rotation.
+        cursor (int): Position in `names` of the next presenter.
+        last_date (str): The last date of the schedule (ISO format).
+        meeting_day (int): The day of the week for the meetings (default is Wednesday, represented by 2).
+        skips (list): The applied skips as [date, comment, name] lists.
+        swaps (list): The applied swaps as [date_1, date_2] lists.
+    """
+    names: list
+    cursor: int = 0
+    last_date: str = None
+    meeting_day: int = 2
+    skips: list = field(default_factory=list)
+    swaps: list = field(default_factory=list)
+
+    def to_json(self) -> str:
+        """ Returns the state as a JSON string """
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, json_str: str) -> ScheduleState:
+        """ Creates the state from a JSON string """
+        return cls(**json.loads(json_str))
+
+class CacheInfo(NamedTuple):
+    """ Statistics of a ScheduleCache """
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+class ScheduleCache:
+    """
+    Least recently used cache for schedule DataFrames.
+
+    Args:
+        maxsize (int): The maximum number of schedules in the cache.
+
+    Attributes:
+        maxsize (int): The maximum number of schedules in the cache.
+        hits (int): The number of lookups that found a schedule.
+        misses (int): The number of lookups that did not find a schedule.
+    """
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def get(self, key: str):
+        """ Returns a copy of the cached schedule for the key, or None """
+        cal = self._data.get(key)
+        if cal is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._data.move_to_end(key)
+        return cal.copy()
+
+    def put(self, key: str, cal: pd.DataFrame) -> None:
+        """ Adds a copy of a schedule to the cache and removes the least recently used schedule if it is full """
+        self._data[key] = cal.copy()
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """ Removes all schedules and resets the counters """
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> CacheInfo:
+        """ Returns the cache statistics """
+        return CacheInfo(hits=self.hits, misses=self.misses, maxsize=self.maxsize, currsize=len(self._data))
+
+class StageTiming(NamedTuple):
+    """
+    Wall time and memory of one stage, recorded by a StageProfiler.
+
+    Attributes:
+        stage (str): The name of the stage, for example 'create_timeboard.merge'.
+        seconds (float): The wall time of the stage in seconds.
+        memory_peak (int): The peak memory allocated during the stage in bytes, or None without tracemalloc.
+    """
+    stage: str
+    seconds: float
+    memory_peak: int
+
+class StageProfiler:
+    """
+    Records the wall time and memory of the stages in the Meetings methods.
+
+    Args:
+        trace_memory (bool): Measure the memory with tracemalloc. Default is True.
+        callback (callable, optional): Function that is called with the StageTiming of each stage.
+
+    Attributes:
+        timings (list): The StageTiming of each stage in the order in which they ran.
+
+    Methods:
+        stage(name): Context manager that records a stage.
+        report(): DataFrame with the recorded stages.
+        summary(): DataFrame with the total time, number of calls and peak memory of each stage.
+    """
+    def __init__(self, trace_memory=True, callback=None):
+        self.trace_memory = trace_memory
+        self.callback = callback
+        self.timings = []
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """ Records the wall time and the peak memory of the code in the context """
+        trace_memory = self.trace_memory and tracemalloc.is_tracing()
+        if trace_memory:
+            memory_start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            memory_peak = tracemalloc.get_traced_memory()[1] - memory_start if trace_memory else None
+            timing = StageTiming(stage=name, seconds=seconds, memory_peak=memory_peak)
+            self.timings.append(timing)
+            logger.debug(f'Stage {name}: {seconds:.6f} s, peak memory: {memory_peak} B')
+            if self.callback is not None:
+                self.callback(timing)
+
+    def report(self) -> pd.DataFrame:
+        """ Returns a DataFrame with the stage, seconds and memory_peak of each recorded stage """
+        return pd.DataFrame(self.timings, columns=list(StageTiming._fields))
+
+    def summary(self) -> pd.DataFrame:
+        """ Returns a DataFrame with the total seconds, the number of calls and the peak memory of each stage """
+        return self.report().groupby('stage', sort=False).agg(seconds=('seconds', 'sum'),
+                                                              calls=('seconds', 'size'),
+                                                              memory_peak=('memory_peak', 'max')).reset_index()
+
+_NO_STAGE = contextlib.nullcontext()
+
+class SequenceProblem(NamedTuple):
+    """
+    The data that the objectives of optimize_sequence need to score presenter orderings.
+
+    Attributes:
+        groups (np.ndarray): Integer group code of each presenter in the roster, -1 for presenters without a group.
+        holidays (np.ndarray): Boolean flag for each meeting of the schedule that falls on a holiday.
+    """
+    groups: np.ndarray
+    holidays: np.ndarray
+
+class SequenceResult(NamedTuple):
+    """
+    The best presenter ordering found by optimize_sequence.
+
+    Attributes:
+        sequence (list): The names in the best order.
+        permutation (np.ndarray): The positions of these names in the roster of the Meetings instance.
+        score (float): The score of the best order. Lower is better.
+        n_trials (int): The number of orderings that were scored.
+    """
+    sequence: list
+    permutation: np.ndarray
+    score: float
+    n_trials: int
+
+def _presenter_slots(perms: np.ndarray, n_meetings: int) -> np.ndarray:
+    """ Roster positions of the presenters of each meeting, with one row for each permutation """
+    return perms[:, np.arange(n_meetings) % perms.shape[1]]
+
+def group_adjacency(perms: np.ndarray, problem: SequenceProblem) -> np.ndarray:
+    """
+    Number of consecutive meetings with presenters of the same group.
+
+    :param perms: Array of shape (n_candidates, n_presenters) with one permutation of the roster in each row.
+    :param problem: The SequenceProblem of the schedule.
+    :return: Array with the number of same-group neighbors for each permutation.
+    """
+    groups = problem.groups[_presenter_slots(perms, len(problem.holidays))]
+    return ((groups[:, 1:] == groups[:, :-1]) & (groups[:, 1:] >= 0)).sum(axis=1)
+
+def holiday_load(perms: np.ndarray, problem: SequenceProblem) -> np.ndarray:
+    """
+    Sum of the squared number of holiday meetings of each presenter.
+    The sum is smallest when the holidays are spread evenly over the presenters.
+
+    :param perms: Array of shape (n_candidates, n_presenters) with one permutation of the roster in each row.
+    :param problem: The SequenceProblem of the schedule.
+    :return: Array with the holiday load for each permutation.
+    """
+    n_candidates, n_presenters = perms.shape
+    presenters = _presenter_slots(perms, len(problem.holidays))[:, problem.holidays]
+    # Count the holidays of each presenter for all permutations with one bincount
+    offset = presenters + n_presenters * np.arange(n_candidates)[:, np.newaxis]
+    counts = np.bincount(offset.ravel(), minlength=n_candidates * n_presenters).reshape(n_candidates, n_presenters)
+    return (counts ** 2).sum(axis=1)
+
+SEQUENCE_OBJECTIVES = {'group_adjacency': group_adjacency,
+                       'holiday_load': holiday_load}
+
+def score_sequences(perms: np.ndarray, problem: SequenceProblem, objective='group_adjacency') -> np.ndarray:
+    """
+    Scores presenter orderings. Lower scores are better.
+
+    :param perms: Array of shape (n_candidates, n_presenters) with one permutation of the roster in each row.
+    :param problem: The SequenceProblem of the schedule.
+    :param objective: The name of an objective in SEQUENCE_OBJECTIVES, a dictionary of objective names and weights,
+                      or a function f(perms, problem) that returns one score for each row of perms.
+    :return: Array with the score of each permutation.
+    """
+    if callable(objective):
+        return np.asarray(objective(perms, problem), dtype=float)
+    weights = {objective: 1.0} if isinstance(objective, str) else objective
+    unknown = set(weights).difference(SEQUENCE_OBJECTIVES)
+    if unknown:
+        raise ValueError(f'Unknown objectives {sorted(unknown)}. Use {list(SEQUENCE_OBJECTIVES)}.')
+    scores = np.zeros(len(perms), dtype=float)
+    for name, weight in weights.items():
+        scores += weight * SEQUENCE_OBJECTIVES[name](perms, problem)
+    return scores
+
+def _search_sequences(problem: SequenceProblem, objective, n_candidates: int, seed) -> tuple:
+    """ Scores a batch of random permutations and returns the best permutation with its score """
+    rng = np.random.default_rng(seed)
+    perms = rng.permuted(np.tile(np.arange(len(problem.groups)), (n_candidates, 1)), axis=1)
+    scores = score_sequences(perms, problem, objective)
+    best = int(np.argmin(scores))
+    return perms[best], float(scores[best])
+
 class Meetings:
     """
     Class for managing meetings and presenters.
@@ -68,22 +452,41 @@ class Meetings:
     Args:
         name_list (list): A list of names.
         group_list (list, optional): A list of corresponding groups for names.
+        country (str, optional): Country code for the holidays in the schedule. Default is 'US'.
+        subdiv (str, optional): Subdivision of the country for the holidays. Default is 'MA'.
+        cache_size (int, optional): Number of schedules to keep in a cache for create_timeboard.
+                                    Default is 0, which disables the cache.
 
     Attributes:
         name_list (list): A list of names.
         col_dict (dict): A dictionary mapping column labels to column names.
         group_list (list): A list of corresponding groups for names.
         name_df (pd.DataFrame): A DataFrame containing the names and groups.
+        country (str): Country code for the holidays in the schedule.
+        subdiv (str): Subdivision of the country for the holidays.
+        cache (ScheduleCache): The cache for create_timeboard, or None if disabled.
+        profiler (StageProfiler): The profiler of the stages in the methods, or None if disabled.
 
     Methods:
         create_name_df(name_list, group_list): Create a DataFrame from the name and group lists.
+        profile(trace_memory, callback): Context manager that records the time and memory of the stages.
         merge_lists(list_of_lists): Merge a list of lists into a single list.
         create_name_sequence(name_sequence, merge_groups): Create a sequence of names.
+        optimize_sequence(start_date, end_date, n_trials, objective, n_jobs): Search for the best order of names.
         skip_date(cal_df, date, comment, name): Skip a date in the calendar DataFrame.
+        skip_dates(cal_df, skips): Skip several dates in the calendar DataFrame in a single pass.
         swap_dates(cal_df, date_1, date_2): Swap two dates in the calendar DataFrame.
+        swap_many(cal_df, pairs): Swap several pairs of dates in the calendar DataFrame.
         create_timeboard(start_date, end_date, start_name, meeting_day): Create a timeboard DataFrame.
+        iter_schedule(start_date, start_name, meeting_day): Generate the meetings without an end date.
+        to_compact(cal_df): Convert a calendar DataFrame to the compact layout.
+        from_compact(compact_df): Convert a compact calendar DataFrame back to the standard layout.
+        cache_info(): Statistics of the create_timeboard cache.
+        clear_cache(): Remove all schedules from the create_timeboard cache.
+        schedule_state(cal_df, meeting_day): Create the rotation state of a calendar DataFrame.
+        extend(state, new_end_date, skips, swaps): Create the calendar rows after the end of a schedule.
     """
-    def __init__(self, name_list: list, group_list=None):
+    def __init__(self, name_list: list, group_list=None, country='US', subdiv='MA', cache_size=0):
         self.name_list = name_list
         self.col_dict = {'date_col': 'date',
                          'group_col': 'group',
@@ -91,6 +494,46 @@ class Meetings:
                          'comment_col': 'comment'}
         self.group_list = group_list
         self.name_df = self.create_name_df(self.name_list, self.group_list)
+        self.country = country
+        self.subdiv = subdiv
+        self.cache = ScheduleCache(maxsize=cache_size) if cache_size > 0 else None
+        self.profiler = None
+
+    @contextlib.contextmanager
+    def profile(self, trace_memory=True, callback=None):
+        """
+        Records the wall time and memory of the stages in create_timeboard, skip_date,
+        swap_dates and create_name_sequence.
+
+        :param trace_memory: Measure the memory with tracemalloc. Default is True.
+        :param callback: Optional function that is called with the StageTiming of each stage.
+        :return: The StageProfiler with the recorded stages.
+
+        Example:
+            with meet.profile() as profiler:
+                cal = meet.create_timeboard(start_date='2025-01-01', end_date='2025-12-31')
+            print(profiler.summary())
+
+        The stages are also logged to the module logger at the DEBUG level.
+        Outside of this context, the stages are not recorded.
+        """
+        profiler = StageProfiler(trace_memory=trace_memory, callback=callback)
+        start_tracing = trace_memory and not tracemalloc.is_tracing()
+        if start_tracing:
+            tracemalloc.start()
+        self.profiler = profiler
+        try:
+            yield profiler
+        finally:
+            self.profiler = None
+            if start_tracing:
+                tracemalloc.stop()
+
+    def _stage(self, name: str):
+        """ Context manager for a stage of the profiler, which does nothing if profiling is disabled """
+        if self.profiler is None:
+            return _NO_STAGE
+        return self.profiler.stage(name)
 
     def create_name_df(self, name_list: list, group_list: list) -> pd.DataFrame:
         name_df = pd.DataFrame({self.col_dict.get('name_col'): name_list})
@@ -102,34 +545,33 @@ class Meetings:
         return name_df
 
     @staticmethod
-    def merge_lists(list_of_lists: list) -> list:
+    def merge_lists(list_of_lists: list, fill='append') -> list:
         """
         Merges a list of lists into a single list.
 
         :param list_of_lists: The list of lists to be merged.
+        :param fill: Policy for lists of unequal length, see :func:`interleave`. Default is 'append'.
         :return: The merged list.
         """
         flattened = list(chain(*list_of_lists))
-        merged = list(reduce(operator.add, zip(*list_of_lists)))
-        # Add missing names at the end of the merged list
-        merged.extend([name for name in flattened if name not in merged])
-        return merged
+        groups = np.repeat(np.arange(len(list_of_lists)), [len(lst) for lst in list_of_lists])
+        return interleave(names=flattened, groups=groups, fill=fill)
 
-    def create_name_sequence(self, name_sequence=None, merge_groups=True) -> list:
+    def create_name_sequence(self, name_sequence=None, merge_groups=True, fill='append') -> list:
         """
         Creates a sequence of presenters
 
         :param name_sequence:   A list containing a specific sequence of names to be used for reordering the data frame.
                                 Default is None.
         :param merge_groups: A boolean indicating whether to merge groups of names or not. Default is True.
+        :param fill: Policy for groups of unequal size, see :func:`interleave`. Default is 'append'.
         :return: A list containing the names in the new sequence.
 
         This method is used to create a new sequence of names for reordering the data frame.
         It takes an optional name_sequence parameter, which allows the user to specify a specific sequence of names.
         If name_sequence is not provided, the method uses the default sequence obtained from the data frame.
         If merge_groups is True and there are groups of names, the method merges the groups into a single list of names.
-        This is done by iterating through the unique groups in the data frame and
-        appending the names belonging to each group to a new list.
+        This is done by interleaving the names of the groups in the order of their first appearance in the data frame.
         After obtaining the new sequence of names, the method reorders the data frame based on this sequence.
         It creates a copy of the original data frame, sets the index to the name column,
         and then reindexes the data frame using the new sequence of names.
@@ -140,18 +582,74 @@ class Meetings:
         if name_sequence is not None:
             presenter_list = [name for name in name_sequence if name in presenter_list]
         if self.group_list is not None and merge_groups:
-            named_group_list = []
             name_col, group_col = self.col_dict.get('name_col'), self.col_dict.get('group_col')
-            for group in self.name_df.get(group_col).unique():
-                named_group_list.\
-                    append(list(self.name_df.loc[self.name_df[group_col] == group, name_col].values))
-            presenter_list = self.merge_lists(list_of_lists=named_group_list)
+            with self._stage('create_name_sequence.interleave'):
+                presenter_list = interleave(names=list(self.name_df[name_col].values),
+                                            groups=list(self.name_df[group_col].values),
+                                            fill=fill)
         # With the new sequence of names, we can re-order the data frame
-        name_df = self.name_df.copy()
-        name_df.index = name_df.get(self.col_dict.get('name_col'))
-        self.name_df = name_df.reindex(index=presenter_list).reset_index(drop=True)
+        with self._stage('create_name_sequence.reindex'):
+            name_df = self.name_df.copy()
+            name_df.index = name_df.get(self.col_dict.get('name_col'))
+            self.name_df = name_df.reindex(index=presenter_list).reset_index(drop=True)
         return presenter_list
 
+    def optimize_sequence(self, start_date: str, end_date: str, n_trials=1000, objective=None, n_jobs=None,
+                          meeting_day=2, seed=None, batch_size=256, country=None, subdiv=None) -> SequenceResult:
+        """
+        Searches random orderings of the presenters for the one with the best schedule.
+
+        :param start_date: The start date of the schedule.
+        :param end_date: The end date of the schedule.
+        :param n_trials: The number of random orderings to score. Default is 1000.
+        :param objective: The objective to minimize, see :func:`score_sequences`.
+                          Default is None, which adds group_adjacency and holiday_load.
+        :param n_jobs: The maximum number of worker processes. Default is None, which uses the number of CPUs.
+                       With n_jobs=1, the orderings are scored in the current process.
+        :param meeting_day: The day of the week for the meetings (default is Wednesday, represented by 2).
+        :param seed: Seed for the random orderings. The result does not depend on n_jobs.
+        :param batch_size: The number of orderings that are scored together with array operations.
+        :param country: Country code for the holidays. Default is None, which uses the country of the instance.
+        :param subdiv: Subdivision for the holidays. Default is None, which uses the subdivision of the instance.
+        :return: SequenceResult with the best names in order and their score.
+
+        The current order of the roster is scored as well, and it is kept unless a random ordering scores lower.
+        Use the sequence with create_name_sequence(name_sequence=result.sequence, merge_groups=False)
+        before create_timeboard. A custom objective must be a module-level function to run in worker processes.
+        """
+        objective = {'group_adjacency': 1.0, 'holiday_load': 1.0} if objective is None else objective
+        country = self.country if country is None else country
+        subdiv = self.subdiv if subdiv is None else subdiv
+        name_col, group_col = self.col_dict.get('name_col'), self.col_dict.get('group_col')
+        groups = np.full(len(self.name_df), -1, dtype=np.int64)
+        if group_col in self.name_df.columns:
+            groups = pd.factorize(self.name_df[group_col])[0].astype(np.int64)
+        dates = meeting_dates(start_date=start_date, end_date=end_date, meeting_day=meeting_day)
+        holidays = np.zeros(len(dates), dtype=bool)
+        if len(dates) > 0:
+            years = dates.astype('datetime64[Y]').astype(int) + 1970
+            index = holiday_index(country=country, subdiv=subdiv, years=(int(years.min()), int(years.max())))
+            holidays = index.lookup(dates)[0].astype(bool)
+        problem = SequenceProblem(groups=groups, holidays=holidays)
+
+        # The random orderings are scored in batches, each with its own seed
+        batch_sizes = [min(batch_size, n_trials - start) for start in range(0, n_trials, batch_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(batch_sizes))
+        if n_jobs == 1:
+            results = [_search_sequences(problem, objective, size, sd) for size, sd in zip(batch_sizes, seeds)]
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                futures = [executor.submit(_search_sequences, problem, objective, size, sd)
+                           for size, sd in zip(batch_sizes, seeds)]
+                results = [future.result() for future in futures]
+        best_perm = np.arange(len(groups))
+        best_score = float(score_sequences(best_perm[np.newaxis, :], problem, objective)[0])
+        for perm, score in results:
+            if score < best_score:
+                best_perm, best_score = perm, score
+        sequence = list(self.name_df[name_col].values[best_perm])
+        return SequenceResult(sequence=sequence, permutation=best_perm, score=best_score, n_trials=n_trials + 1)
+
     def skip_date(self, cal_df: pd.DataFrame, date: str, comment: str, name='Everyone') -> pd.DataFrame:
         """
         Skip a date in the calendar DataFrame.
@@ -170,21 +668,89 @@ class Meetings:
         date_col = self.col_dict.get('date_col')
         name_col = self.col_dict.get('name_col')
         comment_col = self.col_dict.get('comment_col')
-        cal_df_skip = cal_df.loc[cal_df.get(date_col) == date]
-        cal_df_skip.loc[cal_df_skip.get(date_col) == date, comment_col] = comment
+        with self._stage('skip_date.split'):
+            cal_df_skip = cal_df.loc[cal_df.get(date_col) == date]
+            cal_df_skip.loc[cal_df_skip.get(date_col) == date, comment_col] = comment
         if len(cal_df_skip) > 0:
-            cal_df_before = cal_df.loc[cal_df.get(date_col) < date]
-            cal_df_after = cal_df.loc[cal_df.get(date_col) > date]
+            with self._stage('skip_date.split'):
+                cal_df_before = cal_df.loc[cal_df.get(date_col) < date]
+                cal_df_after = cal_df.loc[cal_df.get(date_col) > date]
             # Re-create the calendar for the dates after the skip date
             cal_df_after = self.create_timeboard(start_date=cal_df_after[date_col].min(),
                                                  end_date=cal_df_after[date_col].max(),
                                                  start_name=cal_df_skip.get('name').values[0])
-            cal_df_skip.loc[cal_df_skip.get(date_col) == date, name_col] = name
-            cal_df = pd.concat([cal_df_before, cal_df_skip, cal_df_after], axis=0, ignore_index=True)
+            with self._stage('skip_date.concat'):
+                cal_df_skip.loc[cal_df_skip.get(date_col) == date, name_col] = name
+                cal_df = pd.concat([cal_df_before, cal_df_skip, cal_df_after], axis=0, ignore_index=True)
         else:
             raise ValueError(f'Skip date {date} is not in data.')
         return cal_df
 
+    def skip_dates(self, cal_df: pd.DataFrame, skips: list) -> pd.DataFrame:
+        """
+        Skip several dates in the calendar DataFrame.
+
+        :param cal_df: A pandas DataFrame representing a calendar.
+        :param skips: A list of (date, comment, name) tuples. The name is optional and defaults to 'Everyone'.
+        :return: A pandas DataFrame representing the modified calendar.
+
+        The result is the same as calling skip_date for each of the skips in date order,
+        but the presenter rotation is shifted in a single pass over the calendar
+        instead of re-creating the calendar after every skipped date.
+        The dates of the calendar are kept, so the method also works for meetings that are not on Wednesdays.
+        If any of the skipped dates is not found in the calendar, a ValueError is raised.
+        """
+        date_col = self.col_dict.get('date_col')
+        name_col = self.col_dict.get('name_col')
+        group_col = self.col_dict.get('group_col')
+        comment_col = self.col_dict.get('comment_col')
+        cal_df = cal_df.reset_index(drop=True)
+        skips = [(pd.to_datetime(skip[0]), skip[1], skip[2] if len(skip) > 2 else 'Everyone') for skip in skips]
+        skips = sorted(skips, key=lambda skip: skip[0])
+        # Row position of each date in the calendar
+        date_pos = {dt: pos for pos, dt in reversed(list(enumerate(pd.to_datetime(cal_df[date_col]))))}
+        missing = [str(dt.date()) for dt, _, _ in skips if dt not in date_pos]
+        if len(missing) > 0:
+            raise ValueError(f'Skip dates {", ".join(missing)} are not in data.')
+        if len({dt for dt, _, _ in skips}) < len(skips):
+            raise ValueError('Skip dates must be unique.')
+        if len(skips) == 0:
+            return cal_df
+        skip_pos = np.array([date_pos.get(dt) for dt, _, _ in skips])
+        nlist = np.array(self.name_df[name_col].values, dtype=object)
+        # Index of the first occurrence of each name, as used by cyclic_permutate
+        name_idx = {}
+        for idx, nm in enumerate(nlist):
+            name_idx.setdefault(nm.lower(), idx)
+        # The presenters up to the first skipped date stay the same, after that the rotation is shifted
+        first = skip_pos[0]
+        names = cal_df[name_col].to_numpy(dtype=object).copy()
+        displaced = names[first]
+        for pos, next_pos in zip(skip_pos, list(skip_pos[1:]) + [len(cal_df)]):
+            cursor = name_idx.get(str(displaced).lower())
+            if cursor is None:
+                logger.warning(f'Name "{displaced}" is not in list.')
+                cursor = 0
+            names[pos] = displaced
+            # The skipped presenter moves to the next date
+            n_rows = min(next_pos, len(cal_df) - 1) - pos
+            names[pos + 1:pos + 1 + n_rows] = nlist[(cursor + np.arange(n_rows)) % len(nlist)]
+            if next_pos < len(cal_df):
+                displaced = names[next_pos]
+        # Re-create the calendar columns after the first skipped date
+        tail = cal_df.iloc[first + 1:][[date_col]].assign(**{name_col: names[first + 1:]})
+        tail = self.add_holidays(tail)
+        if group_col in cal_df.columns:
+            groups = self.name_df.drop_duplicates(subset=name_col).set_index(name_col)[group_col]
+            cal_df.loc[first:, group_col] = pd.Series(names[first:]).map(groups).values
+        cal_df.loc[first + 1:, name_col] = tail[name_col].values
+        cal_df.loc[first + 1:, 'holiday'] = tail['holiday'].values
+        cal_df.loc[first + 1:, comment_col] = tail[comment_col].values
+        # Add the comments and names for the skipped dates
+        cal_df.loc[skip_pos, comment_col] = [comment for _, comment, _ in skips]
+        cal_df.loc[skip_pos, name_col] = [name for _, _, name in skips]
+        return cal_df
+
     def swap_dates(self, cal_df: pd.DataFrame, date_1: str, date_2: str) -> pd.DataFrame:
         """
         Swaps the dates of two rows in a given pandas DataFrame.
@@ -199,26 +765,59 @@ class Meetings:
         and swaps the dates of the corresponding rows in the DataFrame.
         The function returns a modified DataFrame with the dates swapped.
         """
-        cal_df_new = cal_df.copy()
-        # Convert the dates to datetime objects
-        lst_dt = [pd.to_datetime(date_1), pd.to_datetime(date_2)]
-        # Check if dates in the table
-        check_dates = in_list(lst=cal_df_new['date'].values, elements=lst_dt)
+        with self._stage('swap_dates.check'):
+            cal_df_new = cal_df.copy()
+            # Convert the dates to datetime objects
+            lst_dt = [pd.to_datetime(date_1), pd.to_datetime(date_2)]
+            # Check if dates in the table
+            check_dates = in_list(lst=cal_df_new['date'].values, elements=lst_dt)
         if check_dates:
-            # Make copies of the rows we want to swap and then swap the dates.
-            df0 = cal_df_new.loc[cal_df_new['date'] == lst_dt[0]]
-            df0.loc[df0['date'] == lst_dt[0], 'date'] = lst_dt[1]
-            df1 = cal_df_new.loc[cal_df_new['date'] == lst_dt[1]]
-            df1.loc[df1['date'] == lst_dt[1], 'date'] = lst_dt[0]
-            # Remove rows with the old dates
-            cal_df_new.drop(cal_df_new.loc[cal_df_new['date'].isin(lst_dt)].index, inplace=True)
-            # Add the changed rows back in
-            cal_df_new = pd.concat([df0, df1, cal_df_new], axis=0). \
-                sort_values(by='date', ascending=True). \
-                reset_index(drop=True)
+            with self._stage('swap_dates.swap'):
+                # Make copies of the rows we want to swap and then swap the dates.
+                df0 = cal_df_new.loc[cal_df_new['date'] == lst_dt[0]]
+                df0.loc[df0['date'] == lst_dt[0], 'date'] = lst_dt[1]
+                df1 = cal_df_new.loc[cal_df_new['date'] == lst_dt[1]]
+                df1.loc[df1['date'] == lst_dt[1], 'date'] = lst_dt[0]
+                # Remove rows with the old dates
+                cal_df_new.drop(cal_df_new.loc[cal_df_new['date'].isin(lst_dt)].index, inplace=True)
+                # Add the changed rows back in
+                cal_df_new = pd.concat([df0, df1, cal_df_new], axis=0). \
+                    sort_values(by='date', ascending=True). \
+                    reset_index(drop=True)
         return cal_df_new
 
-    def create_timeboard(self, start_date: str, end_date: str, start_name=None, meeting_day=2) -> pd.DataFrame:
+    def swap_many(self, cal_df: pd.DataFrame, pairs: list) -> pd.DataFrame:
+        """
+        Swaps several pairs of dates in a calendar DataFrame.
+
+        :param cal_df: The pandas DataFrame containing the calendar data.
+        :param pairs: A list of (date_1, date_2) tuples with the dates to swap.
+        :return: The modified pandas DataFrame with the dates swapped.
+
+        The result is the same as calling swap_dates for each pair in the order of the list.
+        The rows are found with a date index and all swaps are applied as one permutation of the rows,
+        while the date column stays in place, so the calendar does not need to be sorted again.
+        If any of the dates is not in the calendar, a ValueError with all missing dates is raised.
+        """
+        date_col = self.col_dict.get('date_col')
+        cal_df = cal_df.reset_index(drop=True)
+        dates = pd.to_datetime(cal_df[date_col])
+        # Row position of each date in the calendar
+        date_pos = {dt: pos for pos, dt in reversed(list(enumerate(dates)))}
+        pairs = [(pd.to_datetime(date_1), pd.to_datetime(date_2)) for date_1, date_2 in pairs]
+        missing = sorted({dt for pair in pairs for dt in pair if dt not in date_pos})
+        if len(missing) > 0:
+            raise ValueError(f'Swap dates {", ".join(str(dt.date()) for dt in missing)} are not in data.')
+        perm = np.arange(len(cal_df))
+        for date_1, date_2 in pairs:
+            pos_1, pos_2 = date_pos.get(date_1), date_pos.get(date_2)
+            perm[pos_1], perm[pos_2] = perm[pos_2], perm[pos_1]
+        cal_df_new = cal_df.take(perm).reset_index(drop=True)
+        cal_df_new[date_col] = cal_df[date_col].values
+        return cal_df_new
+
+    def create_timeboard(self, start_date: str, end_date: str, start_name=None, meeting_day=2,
+                         engine='timeboard', country=None, subdiv=None, compact=False) -> pd.DataFrame:
         """
         This method creates the meeting schedule using the timeboard library.
 
@@ -227,50 +826,702 @@ class Meetings:
         :param end_date: The end date of the time board.
         :param start_name: The name of the speaker to be rotated to the start.
         :param meeting_day: The day of the week for the meetings (default is Wednesday, represented by 2).
+        :param engine: 'timeboard' (default) builds the schedule with the timeboard library,
+                       'numpy' computes the same schedule with numpy datetime64 arithmetic.
+        :param country: Country code for the holidays. Default is None, which uses the country of the instance.
+        :param subdiv: Subdivision for the holidays. Default is None, which uses the subdivision of the instance.
+        :param compact: If True, return the schedule in the compact layout of to_compact. Default is False.
         :return: The created time board DataFrame.
         """
-        us_ma_holidays = holidays.country_holidays('US', subdiv='MA')
         # Rotate the speakers so that the start_name comes first
         nlist = list(self.name_df[self.col_dict.get('name_col')].values)
         if start_name is not None:
             nlist = cyclic_permutate(lst_in=list(self.name_df[self.col_dict.get('name_col')].values), name=start_name)
-        # Define the list of speakers
-        team_order = tb.RememberingPattern(nlist)
-        # Set a weekly marker for every Wednesday
-        week_day = tb.Marker(each='W', at=[{'days': meeting_day}])
-        weekly = tb.Organizer(marker=week_day, structure=team_order)
-        cal = tb.Timeboard(base_unit_freq='D', start=start_date, end=end_date, layout=weekly)
-        cal = cal.to_dataframe()
-        cal = cal.reset_index(drop=True)[['start', 'label']]. \
-            rename(columns={'start': self.col_dict.get('date_col'),
-                            'label': self.col_dict.get('name_col')})
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(nlist, start_date, end_date, meeting_day, engine, country, subdiv)
+            cal = self.cache.get(cache_key)
+            if cal is not None:
+                return self.to_compact(cal) if compact else cal
+        if engine == 'timeboard':
+            cal = self._timeboard_schedule(start_date, end_date, nlist, meeting_day)
+        elif engine == 'numpy':
+            with self._stage('create_timeboard.numpy'):
+                cal = self._numpy_schedule(start_date, end_date, nlist, meeting_day)
+        else:
+            raise ValueError(f'Unknown engine "{engine}". Use "timeboard" or "numpy".')
+
+        cal = self._complete_schedule(cal, country=country, subdiv=subdiv)
+        if cache_key is not None:
+            self.cache.put(cache_key, cal)
+        return self.to_compact(cal) if compact else cal
+
+    def to_compact(self, cal_df: pd.DataFrame, epoch='1970-01-01') -> pd.DataFrame:
+        """
+        Converts a calendar DataFrame to a compact layout.
+
+        :param cal_df: A pandas DataFrame representing a calendar, for example from create_timeboard.
+        :param epoch: The date for day offset 0. Default is '1970-01-01'.
+        :return: The compact calendar DataFrame.
+
+        The dates are stored as int32 day offsets from the epoch, which is kept in the attrs of the DataFrame.
+        The names and groups are categorical columns with the roster of the instance as the first categories,
+        followed by other names in the calendar, such as the names for skipped dates.
+        The comments are a categorical column as well.
+        Use from_compact to convert the compact DataFrame back to the standard layout.
+
+        Memory use (DataFrame.memory_usage(deep=True)) of weekly schedules with 5 groups:
 
+        ======== ======= ====== ========= ========
+        Names    Years   Rows   Standard  Compact
+        ======== ======= ====== ========= ========
+        30       20      1044   171 KB    13 KB
+        500      20      1044   172 KB    61 KB
+        500      200     10436  1712 KB   145 KB
+        ======== ======= ====== ========= ========
+        """
+        date_col = self.col_dict.get('date_col')
+        name_col = self.col_dict.get('name_col')
+        group_col = self.col_dict.get('group_col')
+        comment_col = self.col_dict.get('comment_col')
+        compact_df = cal_df.copy()
+        days = (pd.to_datetime(compact_df[date_col]) - pd.Timestamp(epoch)).dt.days
+        compact_df[date_col] = days.astype(np.int32)
+        for col in [name_col, group_col]:
+            if col in compact_df.columns:
+                roster = list(self.name_df[col].dropna().unique()) if col in self.name_df.columns else []
+                roster_set = set(roster)
+                other = [val for val in compact_df[col].dropna().unique() if val not in roster_set]
+                compact_df[col] = pd.Categorical(compact_df[col], categories=roster + other)
+        if comment_col in compact_df.columns:
+            compact_df[comment_col] = compact_df[comment_col].astype('category')
+        compact_df.attrs['epoch'] = str(pd.Timestamp(epoch).date())
+        return compact_df
+
+    def from_compact(self, compact_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Converts a compact calendar DataFrame from to_compact back to the standard layout.
+
+        :param compact_df: The compact calendar DataFrame.
+        :return: The calendar DataFrame with datetime64 dates and object columns for the names, groups and comments.
+        """
+        date_col = self.col_dict.get('date_col')
+        cal_df = compact_df.copy()
+        epoch = pd.Timestamp(compact_df.attrs.get('epoch', '1970-01-01'))
+        cal_df[date_col] = (epoch + pd.to_timedelta(cal_df[date_col].astype(np.int64), unit='D')). \
+            astype('datetime64[ns]')
+        for col in [self.col_dict.get('name_col'), self.col_dict.get('group_col')]:
+            if col in cal_df.columns:
+                cal_df[col] = cal_df[col].astype(object)
+        comment_col = self.col_dict.get('comment_col')
+        if comment_col in cal_df.columns:
+            comment = cal_df[comment_col].astype(object)
+            cal_df[comment_col] = comment.where(comment.notna(), None)
+        cal_df.attrs = {}
+        return cal_df
+
+    def cache_info(self) -> CacheInfo:
+        """
+        Statistics of the create_timeboard cache.
+
+        :return: CacheInfo with the hits, misses, maximum size and current size of the cache.
+        """
+        if self.cache is None:
+            return CacheInfo(hits=0, misses=0, maxsize=0, currsize=0)
+        return self.cache.info()
+
+    def clear_cache(self) -> None:
+        """ Removes all schedules from the create_timeboard cache and resets its counters """
+        if self.cache is not None:
+            self.cache.clear()
+
+    def _cache_key(self, nlist: list, *args) -> str:
+        """ Hash of the rotated names, the name DataFrame with the groups and the schedule arguments """
+        args = [str(pd.Timestamp(arg)) if isinstance(arg, pd.Timestamp) else arg for arg in args]
+        args = args + [self.country, self.subdiv]
+        key = hashlib.sha256(json.dumps([nlist, args], default=str).encode())
+        key.update(pd.util.hash_pandas_object(self.name_df, index=False).values.tobytes())
+        key.update(json.dumps(list(self.name_df.columns)).encode())
+        return key.hexdigest()
+
+    def schedule_state(self, cal_df: pd.DataFrame, meeting_day=2) -> ScheduleState:
+        """
+        Creates the rotation state at the end of a calendar DataFrame.
+
+        :param cal_df: A pandas DataFrame representing a calendar, for example from create_timeboard.
+        :param meeting_day: The day of the week for the meetings (default is Wednesday, represented by 2).
+        :return: The ScheduleState that continues the rotation after the last date of the calendar.
+
+        The roster order is taken from the name DataFrame of the instance.
+        Swaps do not change the number of rows with roster names, so the cursor is the start position
+        of the rotation plus this number. The start position is the one whose rotation matches
+        the most rows of the calendar, which also holds for calendars with swapped dates.
+        If several start positions match equally well, the state is ambiguous and a ValueError is raised.
+        Rows with names that are not in the roster are recorded as skips.
+        """
+        date_col = self.col_dict.get('date_col')
+        name_col = self.col_dict.get('name_col')
+        comment_col = self.col_dict.get('comment_col')
+        names = list(self.name_df[name_col].values)
+        names_low = [nm.lower() for nm in names]
+        cal_names = cal_df[name_col].astype(str).str.lower()
+        in_roster = cal_names.isin(names_low).values
+        cursor = 0
+        if in_roster.any():
+            # Roster position of the presenter of each row, with the first position for repeated names
+            name_pos = {}
+            for pos, nm in enumerate(names_low):
+                name_pos.setdefault(nm, pos)
+            observed = np.array([name_pos.get(nm) for nm in cal_names.values[in_roster]], dtype=np.int64)
+            # Row k matches the rotation from start position s if observed[k] == (s + k) % len(names),
+            # so counting (observed[k] - k) % len(names) scores all start positions in one pass
+            matches = np.bincount((observed - np.arange(len(observed))) % len(names), minlength=len(names))
+            best = np.flatnonzero(matches == matches.max())
+            if len(best) > 1:
+                raise ValueError('The rotation of the calendar is ambiguous, '
+                                 f'{len(best)} start positions match {matches.max()} rows.')
+            cursor = int((best[0] + len(observed)) % len(names))
+        dates = pd.to_datetime(cal_df[date_col])
+        skips = [[str(dt.date()), comment, nm] for dt, comment, nm in
+                 zip(dates[~in_roster], cal_df[comment_col].values[~in_roster], cal_df[name_col].values[~in_roster])]
+        return ScheduleState(names=names,
+                             cursor=cursor,
+                             last_date=str(dates.max().date()),
+                             meeting_day=meeting_day,
+                             skips=skips)
+
+    def extend(self, state: ScheduleState, new_end_date: str, skips=None, swaps=None) -> tuple:
+        """
+        Creates the calendar rows after the end of a schedule.
+
+        :param state: The ScheduleState at the end of the schedule.
+        :param new_end_date: The new end date of the schedule.
+        :param skips: Optional list of (date, comment, name) tuples for dates to skip in the new rows.
+                      The name is optional and defaults to 'Everyone'.
+                      A ValueError is raised if any of the dates is not a meeting date of the new rows.
+        :param swaps: Optional list of (date_1, date_2) tuples with dates to swap in the new rows.
+                      A ValueError is raised if any of the dates is not in the new rows.
+        :return: A tuple with the DataFrame of the new rows and the updated ScheduleState.
+
+        Only the meeting dates after the last date of the state are created,
+        so the work depends on the number of new dates and not on the length of the whole schedule.
+        Skipped dates do not advance the rotation, as in skip_date.
+        """
+        if state.last_date is None:
+            raise ValueError('The schedule state has no last date.')
+        date_col = self.col_dict.get('date_col')
+        name_col = self.col_dict.get('name_col')
+        comment_col = self.col_dict.get('comment_col')
+        dates = np.array([], dtype='datetime64[D]')
+        if pd.Timestamp(new_end_date) > pd.Timestamp(state.last_date):
+            dates = meeting_dates(start_date=state.last_date, end_date=new_end_date,
+                                  meeting_day=state.meeting_day)[1:]
+        skips = [(pd.to_datetime(skip[0]), skip[1], skip[2] if len(skip) > 2 else 'Everyone')
+                 for skip in (skips or [])]
+        skip_dict = {dt.to_datetime64().astype('datetime64[D]'): (comment, nm) for dt, comment, nm in skips}
+        skip_dates = np.array(sorted(skip_dict), dtype='datetime64[D]')
+        missing = skip_dates[~np.isin(skip_dates, dates)]
+        if len(missing) > 0:
+            raise ValueError(f'Skip dates {", ".join(str(dt) for dt in missing)} are not in the new dates.')
+        is_skip = np.isin(dates, skip_dates)
+        # The rotation advances only on dates that are not skipped
+        roster = np.array(state.names, dtype=object)
+        rotation = state.cursor + np.cumsum(~is_skip) - (~is_skip)
+        cal = pd.DataFrame({date_col: dates.astype('datetime64[ns]'),
+                            name_col: roster[rotation % len(roster)] if len(roster) > 0 else None})
+        cal = self._complete_schedule(cal)
+        skip_pos = np.flatnonzero(is_skip)
+        if len(skip_pos) > 0:
+            cal.loc[skip_pos, comment_col] = [skip_dict[dt][0] for dt in dates[skip_pos]]
+            cal.loc[skip_pos, name_col] = [skip_dict[dt][1] for dt in dates[skip_pos]]
+        if swaps:
+            # swap_many raises a ValueError for dates that are not in the new rows
+            cal = self.swap_many(cal, pairs=swaps)
+        new_state = ScheduleState(names=list(state.names),
+                                  cursor=int((state.cursor + np.sum(~is_skip)) % max(len(roster), 1)),
+                                  last_date=str(dates[-1]) if len(dates) > 0 else state.last_date,
+                                  meeting_day=state.meeting_day,
+                                  skips=state.skips + [[str(dates[pos]), *skip_dict[dates[pos]]]
+                                                       for pos in skip_pos],
+                                  swaps=state.swaps + [[str(pd.Timestamp(d1).date()), str(pd.Timestamp(d2).date())]
+                                                       for d1, d2 in (swaps or [])])
+        return cal, new_state
+
+    def iter_schedule(self, start_date: str, start_name=None, meeting_day=2, country=None, subdiv=None):
+        """
+        Generates the meetings of the schedule lazily, without an end date.
+
+        :param start_date: The start date of the schedule.
+        :param start_name: The name of the speaker to be rotated to the start.
+        :param meeting_day: The day of the week for the meetings (default is Wednesday, represented by 2).
+        :param country: Country code for the holidays. Default is None, which uses the country of the instance.
+        :param subdiv: Subdivision for the holidays. Default is None, which uses the subdivision of the instance.
+        :return: A generator of ScheduleRecord tuples with the date, name, group, holiday and comment.
+
+        The records are the rows that create_timeboard would create for the same arguments.
+        The dates are computed one year at a time, so the memory use does not depend on the horizon.
+        Use itertools.islice or itertools.takewhile to limit the schedule
+        and chunk_schedule to convert the records into DataFrames.
+        """
+        country = self.country if country is None else country
+        subdiv = self.subdiv if subdiv is None else subdiv
+        name_col, group_col = self.col_dict.get('name_col'), self.col_dict.get('group_col')
+        nlist = list(self.name_df[name_col].values)
+        if start_name is not None:
+            nlist = cyclic_permutate(lst_in=nlist, name=start_name)
+        names = np.array(nlist, dtype=object)
+        groups = np.full(len(names), None, dtype=object)
+        if group_col in self.name_df.columns:
+            group_dict = self.name_df.drop_duplicates(subset=name_col).set_index(name_col)[group_col].to_dict()
+            groups = np.array([group_dict.get(nm) for nm in names], dtype=object)
+        start = pd.Timestamp(start_date).normalize()
+        year, count = start.year, 0
+        dates = meeting_dates(start_date=start, end_date=f'{year}-12-31', meeting_day=meeting_day)
+        while True:
+            flag, comment = holiday_index(country=country, subdiv=subdiv, years=(year, year)).lookup(dates)
+            idx = (count + np.arange(len(dates))) % len(names)
+            for dt, nm, grp, hol, cmt in zip(dates, names[idx], groups[idx], flag, comment):
+                yield ScheduleRecord(date=pd.Timestamp(dt), name=nm, group=grp, holiday=bool(hol), comment=cmt)
+            count += len(dates)
+            if not 0 <= meeting_day <= 6:
+                return
+            # The meetings of the next year
+            year += 1
+            dates = meeting_dates(start_date=f'{year - 1}-12-31', end_date=f'{year}-12-31',
+                                  meeting_day=meeting_day)[1:]
+
+    def _complete_schedule(self, cal: pd.DataFrame, country=None, subdiv=None) -> pd.DataFrame:
+        """ Adds the member information and the holidays to the date and name columns of a schedule """
         # Merge with the other member information
-        cal = cal.merge(right=self.name_df, on=self.col_dict.get('name_col'), how='left')
+        with self._stage('create_timeboard.merge'):
+            cal = cal.merge(right=self.name_df, on=self.col_dict.get('name_col'), how='left')
 
-        # Add the MA holidays to this data frame
-        cal = cal.assign(holiday=cal.get('date').apply(lambda dt: dt in us_ma_holidays),
-                         comment=cal.get('date').apply(lambda dt: us_ma_holidays.get(dt)))
+        # Add the holidays to this data frame
+        with self._stage('create_timeboard.holidays'):
+            cal = self.add_holidays(cal, country=country, subdiv=subdiv)
 
         # Convert the date to the pandas datetime type
-        cal = cal.astype({self.col_dict.get('date_col'): 'datetime64[ns]'})
+        with self._stage('create_timeboard.astype'):
+            cal = cal.astype({self.col_dict.get('date_col'): 'datetime64[ns]'})
+
+        return cal
+
+    def add_holidays(self, cal_df: pd.DataFrame, country=None, subdiv=None) -> pd.DataFrame:
+        """
+        Adds the holiday and comment columns to a calendar DataFrame.
+
+        :param cal_df: A pandas DataFrame with a date column.
+        :param country: Country code for the holidays. Default is None, which uses the country of the instance.
+        :param subdiv: Subdivision for the holidays. Default is None, which uses the subdivision of the instance.
+        :return: The DataFrame with the holiday flag and the holiday names in the comment column.
+        """
+        country = self.country if country is None else country
+        subdiv = self.subdiv if subdiv is None else subdiv
+        dates = pd.to_datetime(cal_df[self.col_dict.get('date_col')]).values.astype('datetime64[D]')
+        flag = np.zeros(len(dates), dtype=bool)
+        comment = np.full(len(dates), None, dtype=object)
+        if len(dates) > 0:
+            years = dates.astype('datetime64[Y]').astype(int) + 1970
+            index = holiday_index(country=country, subdiv=subdiv, years=(int(years.min()), int(years.max())))
+            flag, comment = index.lookup(dates)
+        return cal_df.assign(**{'holiday': flag, self.col_dict.get('comment_col'): comment})
+
+    def _timeboard_schedule(self, start_date, end_date, nlist: list, meeting_day: int) -> pd.DataFrame:
+        """ Date and name columns of the schedule, computed with the timeboard library """
+        # The timeboard library is only imported for this engine
+        import timeboard as tb
+        with self._stage('create_timeboard.timeboard'):
+            # Define the list of speakers
+            team_order = tb.RememberingPattern(nlist)
+            # Set a weekly marker for every Wednesday
+            week_day = tb.Marker(each='W', at=[{'days': meeting_day}])
+            weekly = tb.Organizer(marker=week_day, structure=team_order)
+            cal = tb.Timeboard(base_unit_freq='D', start=start_date, end=end_date, layout=weekly)
+        with self._stage('create_timeboard.to_dataframe'):
+            cal = cal.to_dataframe()
+            cal = cal.reset_index(drop=True)[['start', 'label']]. \
+                rename(columns={'start': self.col_dict.get('date_col'),
+                                'label': self.col_dict.get('name_col')})
+        return cal
 
+    def _numpy_schedule(self, start_date, end_date, nlist: list, meeting_day: int) -> pd.DataFrame:
+        """ Date and name columns of the schedule, computed with numpy datetime64 arithmetic """
+        dates = meeting_dates(start_date=start_date, end_date=end_date, meeting_day=meeting_day)
+        names = np.array(nlist, dtype=object)
+        # The presenters rotate through the name list
+        cal = pd.DataFrame({self.col_dict.get('date_col'): dates.astype('datetime64[ns]'),
+                            self.col_dict.get('name_col'): names[np.arange(len(dates)) % len(names)]})
         return cal
 
 
+@dataclass
+class ScheduleSpec:
+    """
+    Specification of a meeting schedule for :func:`schedule_many`.
+
+    Attributes:
+        name_list (list): A list of names.
+        start_date (str): The start date of the schedule.
+        end_date (str): The end date of the schedule.
+        group_list (list, optional): A list of corresponding groups for names.
+        start_name (str, optional): The name of the speaker to be rotated to the start.
+        meeting_day (int): The day of the week for the meetings (default is Wednesday, represented by 2).
+        roster (str, optional): Key of the roster in the combined schedule. Default is the position of the spec.
+        engine (str): The engine for create_timeboard (default is 'timeboard').
+    """
+    name_list: list
+    start_date: str
+    end_date: str
+    group_list: list = None
+    start_name: str = None
+    meeting_day: int = 2
+    roster: str = None
+    engine: str = 'timeboard'
+
+class ScheduleBatch(NamedTuple):
+    """
+    Result of :func:`schedule_many`.
+
+    Attributes:
+        schedule (pd.DataFrame): The schedules of all rosters that succeeded, with a roster column.
+        errors (dict): The exception for each roster that failed.
+    """
+    schedule: pd.DataFrame
+    errors: dict
+
+def create_schedule(spec: ScheduleSpec) -> pd.DataFrame:
+    """
+    Creates the meeting schedule for one specification.
+
+    :param spec: The ScheduleSpec.
+    :return: The schedule DataFrame from Meetings.create_timeboard.
+    """
+    meet = Meetings(name_list=spec.name_list, group_list=spec.group_list)
+    if spec.group_list is not None:
+        meet.create_name_sequence()
+    return meet.create_timeboard(start_date=spec.start_date,
+                                 end_date=spec.end_date,
+                                 start_name=spec.start_name,
+                                 meeting_day=spec.meeting_day,
+                                 engine=spec.engine)
+
+def schedule_many(specs: list, max_workers=None, roster_col='roster') -> ScheduleBatch:
+    """
+    Creates the meeting schedules for many rosters in parallel processes.
+
+    :param specs: A list of ScheduleSpec objects or dictionaries with the ScheduleSpec fields.
+    :param max_workers: The maximum number of worker processes. Default is None, which uses the number of CPUs.
+                        With max_workers=1, the schedules are created in the current process.
+    :param roster_col: The name of the roster key column in the combined schedule. Default is 'roster'.
+    :return: ScheduleBatch with the combined schedule and the errors for each roster that failed.
+
+    The schedules are combined in the order of the specs, independent of the order in which the workers finish.
+    A roster that fails does not stop the batch, including a dictionary that is not a valid ScheduleSpec.
+    Its exception is reported in the errors of the result.
+    """
+    # A spec that is not valid is reported as the error of its roster
+    results = []
+    for spec in specs:
+        if isinstance(spec, dict):
+            try:
+                spec = ScheduleSpec(**spec)
+            except Exception as e:
+                spec = e
+        elif not isinstance(spec, ScheduleSpec):
+            spec = TypeError(f'Expected a ScheduleSpec or a dictionary, but got {type(spec).__name__}.')
+        results.append(spec)
+    keys = []
+    for idx, (spec, result) in enumerate(zip(specs, results)):
+        roster = spec.get('roster') if isinstance(spec, dict) else getattr(result, 'roster', None)
+        keys.append(str(idx) if roster is None else roster)
+    if len(set(keys)) < len(keys):
+        raise ValueError('The roster keys of the specs must be unique.')
+    valid = [pos for pos, result in enumerate(results) if isinstance(result, ScheduleSpec)]
+    if max_workers == 1:
+        for pos in valid:
+            try:
+                results[pos] = create_schedule(results[pos])
+            except Exception as e:
+                results[pos] = e
+    elif len(valid) > 0:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {pos: executor.submit(create_schedule, results[pos]) for pos in valid}
+            for pos, future in futures.items():
+                results[pos] = future.exception() or future.result()
+    schedules, errors = [], {}
+    for key, result in zip(keys, results):
+        if isinstance(result, Exception):
+            logger.error(f'Schedule failed for roster {key}: {result}')
+            errors[key] = result
+        else:
+            schedules.append(result.assign(**{roster_col: key})[[roster_col, *result.columns]])
+    schedule = pd.concat(schedules, axis=0, ignore_index=True) if len(schedules) > 0 else pd.DataFrame()
+    return ScheduleBatch(schedule=schedule, errors=errors)
+
+
+class ScheduleStats(NamedTuple):
+    """
+    Result of :func:`schedule_stats`.
+
+    Attributes:
+        presenters (pd.DataFrame): The number of talks, first and last date, mean and minimum gap in days
+                                   and number of holiday talks of each presenter.
+        groups (pd.DataFrame): The number of talks and presenters of each group, their shares,
+                               the balance of the two shares and the number of talks after a talk of the same group.
+        collisions (pd.DataFrame): The talks that fall on holidays.
+    """
+    presenters: pd.DataFrame
+    groups: pd.DataFrame
+    collisions: pd.DataFrame
+
+def schedule_stats(cal_df: pd.DataFrame, roster_col=None, exclude=('Everyone',), date_col='date',
+                   name_col='name', group_col='group', holiday_col='holiday', comment_col='comment') -> ScheduleStats:
+    """
+    Computes the fairness and spacing statistics of a schedule.
+
+    :param cal_df: A schedule from create_timeboard, skip_date, swap_dates or schedule_many.
+    :param roster_col: The roster key column of schedules with several rosters, such as 'roster' for schedule_many.
+                       Default is None for a schedule with one roster.
+    :param exclude: Names of the rows that are not talks, such as the skipped dates. Default is ('Everyone',).
+    :param date_col: The date column. Default is 'date'.
+    :param name_col: The name column. Default is 'name'.
+    :param group_col: The group column. Its statistics are omitted if the schedule has no such column.
+    :param holiday_col: The holiday flag column. Default is 'holiday'.
+    :param comment_col: The comment column with the holiday names. Default is 'comment'.
+    :return: ScheduleStats with the presenter, group and holiday collision tables.
+
+    The statistics are computed with groupby operations on a categorical name column.
+    A ratio of 1.0 in the balance column of the groups means that the group has as many talks
+    as its number of presenters would suggest. The gaps of presenters with only one talk are NaN.
+    """
+    keys = [] if roster_col is None else [roster_col]
+    has_group = group_col in cal_df.columns
+    has_holiday = holiday_col in cal_df.columns
+    talks = cal_df.loc[~cal_df[name_col].isin(list(exclude))]
+    talks = talks.assign(**{date_col: pd.to_datetime(talks[date_col]),
+                            name_col: talks[name_col].astype('category')})
+    if not has_holiday:
+        talks = talks.assign(**{holiday_col: False})
+    talks = talks.sort_values(by=[*keys, date_col], kind='stable')
+
+    # Gaps between the talks of each presenter
+    presenter_keys = [*keys, name_col]
+    talks = talks.assign(gap_days=talks.groupby(presenter_keys, observed=True)[date_col].diff().dt.days)
+    aggregations = dict(talks=(date_col, 'size'),
+                        first=(date_col, 'min'),
+                        last=(date_col, 'max'),
+                        mean_gap_days=('gap_days', 'mean'),
+                        min_gap_days=('gap_days', 'min'),
+                        holidays=(holiday_col, 'sum'))
+    if has_group:
+        aggregations = dict(group=(group_col, 'first'), **aggregations)
+    presenters = talks.groupby(presenter_keys, observed=True).agg(**aggregations).reset_index()
+
+    # Balance of the talks between the groups
+    groups = pd.DataFrame(columns=[*keys, group_col, 'talks', 'presenters', 'talk_share',
+                                   'presenter_share', 'balance', 'adjacent'])
+    if has_group:
+        if len(keys) > 0:
+            previous_group = talks.groupby(keys, observed=True)[group_col].shift()
+        else:
+            previous_group = talks[group_col].shift()
+        talks = talks.assign(adjacent=(talks[group_col] == previous_group) & talks[group_col].notna())
+        groups = talks.groupby([*keys, group_col], observed=True).agg(talks=(name_col, 'size'),
+                                                                     presenters=(name_col, 'nunique'),
+                                                                     adjacent=('adjacent', 'sum')).reset_index()
+        if len(keys) > 0:
+            totals = groups.groupby(keys)[['talks', 'presenters']].transform('sum')
+        else:
+            totals = groups[['talks', 'presenters']].sum()
+        groups = groups.assign(talk_share=groups['talks'] / totals['talks'],
+                               presenter_share=groups['presenters'] / totals['presenters'])
+        groups = groups.assign(balance=groups['talk_share'] / groups['presenter_share'])
+        groups = groups[[*keys, group_col, 'talks', 'presenters', 'talk_share',
+                         'presenter_share', 'balance', 'adjacent']]
+
+    # Talks on holidays
+    collision_cols = [col for col in [*keys, date_col, name_col, group_col, comment_col] if col in talks.columns]
+    collisions = talks.loc[talks[holiday_col].astype(bool), collision_cols].reset_index(drop=True)
+    return ScheduleStats(presenters=presenters, groups=groups, collisions=collisions)
+
+
+class ScheduleIndex:
+    """
+    Index of a schedule for fast lookups of who presents when.
+
+    Args:
+        cal_df (pd.DataFrame): A schedule from create_timeboard, skip_date, swap_dates or schedule_many.
+        date_col (str, optional): The date column. Default is 'date'.
+        name_col (str, optional): The name column. Default is 'name'.
+
+    Attributes:
+        cal_df (pd.DataFrame): The schedule sorted by date.
+        dates (np.ndarray): The sorted datetime64 dates of the schedule.
+        names (np.ndarray): The name of each row of the sorted schedule.
+        positions (dict): The sorted row positions of each name.
+
+    Methods:
+        who(date): Names of the presenters on a date.
+        next(name, after): Date of the next talk of a name.
+        talks(name): Rows of the talks of a name.
+        between(start_date, end_date): Rows of the talks in a date range.
+        refresh(cal_df): Update the index after edits such as skip_date or swap_dates.
+
+    The lookups use binary search on the sorted dates, so they take O(log n) time.
+    """
+    def __init__(self, cal_df: pd.DataFrame, date_col='date', name_col='name'):
+        self.date_col = date_col
+        self.name_col = name_col
+        self.cal_df = None
+        self.dates = np.array([], dtype='datetime64[ns]')
+        self.names = np.array([], dtype=object)
+        self.positions = {}
+        self.refresh(cal_df)
+
+    @staticmethod
+    def _group_positions(names: np.ndarray, offset=0) -> dict:
+        """ Sorted positions of each name in an array of names, shifted by an offset """
+        codes, uniques = pd.factorize(names)
+        order = np.argsort(codes, kind='stable')
+        splits = np.cumsum(np.bincount(codes[codes >= 0], minlength=len(uniques)))[:-1]
+        return {nm: pos + offset for nm, pos in zip(uniques, np.split(order[codes[order] >= 0], splits))}
+
+    def refresh(self, cal_df: pd.DataFrame) -> ScheduleIndex:
+        """
+        Updates the index for an edited version of the schedule.
+
+        :param cal_df: The new schedule, for example the result of skip_date or swap_dates.
+        :return: The updated ScheduleIndex.
+
+        If only names changed, as with swap_dates, only the positions of these names are updated.
+        Otherwise, the positions before the first changed row are kept and only the rows after it are indexed again.
+        """
+        if not cal_df[self.date_col].is_monotonic_increasing:
+            cal_df = cal_df.sort_values(by=self.date_col, kind='stable')
+        cal_df = cal_df.reset_index(drop=True)
+        dates = pd.to_datetime(cal_df[self.date_col]).to_numpy(dtype='datetime64[ns]')
+        names = cal_df[self.name_col].to_numpy(dtype=object)
+        n_common = min(len(dates), len(self.dates))
+        changed = np.flatnonzero((dates[:n_common] != self.dates[:n_common]) |
+                                 (names[:n_common] != self.names[:n_common]))
+        if len(dates) == len(self.dates) and np.array_equal(dates, self.dates):
+            # Only names changed, so we move the changed positions between the names
+            for nm, pos in self._group_positions(self.names[changed]).items():
+                self.positions[nm] = np.setdiff1d(self.positions[nm], changed[pos], assume_unique=True)
+                if len(self.positions[nm]) == 0:
+                    del self.positions[nm]
+            for nm, pos in self._group_positions(names[changed]).items():
+                self.positions[nm] = np.union1d(self.positions.get(nm, np.array([], dtype=np.int64)), changed[pos])
+        else:
+            # Keep the positions before the first changed row and index the rows after it
+            first = changed[0] if len(changed) > 0 else n_common
+            positions = {nm: pos[:np.searchsorted(pos, first)] for nm, pos in self.positions.items()}
+            for nm, pos in self._group_positions(names[first:], offset=first).items():
+                positions[nm] = np.concatenate([positions.get(nm, np.array([], dtype=np.int64)), pos])
+            self.positions = {nm: pos for nm, pos in positions.items() if len(pos) > 0}
+        self.cal_df, self.dates, self.names = cal_df, dates, names
+        return self
+
+    def who(self, date) -> list:
+        """
+        Names of the presenters on a date.
+
+        :param date: The date of the meeting.
+        :return: A list with the names, which is empty if there is no meeting on the date.
+        """
+        date = np.datetime64(pd.Timestamp(date).normalize(), 'ns')
+        start, end = np.searchsorted(self.dates, date, side='left'), np.searchsorted(self.dates, date, side='right')
+        return list(self.names[start:end])
+
+    def next(self, name: str, after=None):
+        """
+        Date of the next talk of a presenter.
+
+        :param name: The name of the presenter.
+        :param after: Talks on or after this date are considered. Default is None, which uses today.
+        :return: The date as pd.Timestamp, or None if the presenter has no talk on or after the date.
+        """
+        after = pd.Timestamp.today() if after is None else pd.Timestamp(after)
+        pos = self.positions.get(name, np.array([], dtype=np.int64))
+        # The positions are sorted like the dates, so the first position after the date is the next talk
+        idx = np.searchsorted(pos, np.searchsorted(self.dates, np.datetime64(after.normalize(), 'ns'), side='left'))
+        return pd.Timestamp(self.dates[pos[idx]]) if idx < len(pos) else None
+
+    def talks(self, name: str) -> pd.DataFrame:
+        """
+        Rows of the talks of a presenter.
+
+        :param name: The name of the presenter.
+        :return: The rows of the schedule with this name, in date order.
+        """
+        return self.cal_df.iloc[self.positions.get(name, np.array([], dtype=np.int64))]
+
+    def between(self, start_date, end_date) -> pd.DataFrame:
+        """
+        Rows of the talks in a date range.
+
+        :param start_date: The first date of the range.
+        :param end_date: The last date of the range, which is included.
+        :return: The rows of the schedule from start_date to end_date.
+        """
+        start = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start_date), 'ns'), side='left')
+        end = np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end_date), 'ns'), side='right')
+        return self.cal_df.iloc[start:end]
+
+
+def find_conflicts(schedules, window_days=0, roster_col='roster', exclude=('Everyone',),
+                   date_col='date', name_col='name') -> pd.DataFrame:
+    """
+    Finds people who present in several meeting series within a window of days.
+
+    :param schedules: A dictionary of series keys and schedules, a list of schedules,
+                      or one schedule with a roster column such as the result of schedule_many.
+    :param window_days: Two talks of the same person in different series conflict
+                        if they are at most this many days apart. Default is 0 for talks on the same day.
+    :param roster_col: The roster column of a combined schedule. Default is 'roster'.
+    :param exclude: Names of the rows that are not talks, such as the skipped dates. Default is ('Everyone',).
+    :param date_col: The date column. Default is 'date'.
+    :param name_col: The name column. Default is 'name'.
+    :return: A DataFrame with the name, the two series, the two dates and the days between them for each conflict.
+
+    The sorted talks of all series are merged with a heap in a single pass over the dates.
+    For each person, only the talks within the window are kept, so the series are never compared pairwise.
+    The keys of a list of schedules are their positions in the list.
+    """
+    if isinstance(schedules, pd.DataFrame):
+        schedules = dict(list(schedules.groupby(roster_col, sort=False)))
+    elif not isinstance(schedules, dict):
+        schedules = dict(enumerate(schedules))
+
+    def talks(key, cal_df):
+        """ Talks of one series as (day number, key, name) tuples in date order """
+        cal_df = cal_df.loc[~cal_df[name_col].isin(list(exclude))]
+        days = pd.to_datetime(cal_df[date_col]).to_numpy(dtype='datetime64[D]').astype(np.int64)
+        order = np.argsort(days, kind='stable')
+        return zip(days[order].tolist(), [key] * len(order), cal_df[name_col].to_numpy(dtype=object)[order])
+
+    recent = defaultdict(deque)
+    conflicts = []
+    merged = heapq.merge(*[talks(key, cal_df) for key, cal_df in schedules.items()], key=lambda talk: talk[0])
+    for day, key, name in merged:
+        window = recent[name]
+        # Forget the talks of this person that are outside of the window
+        while window and window[0][0] < day - window_days:
+            window.popleft()
+        conflicts.extend([(name, other_key, other_day, key, day) for other_day, other_key in window
+                          if other_key != key])
+        window.append((day, key))
+    conflicts = pd.DataFrame(conflicts, columns=[name_col, 'series_1', 'date_1', 'series_2', 'date_2'])
+    conflicts = conflicts.assign(date_1=conflicts['date_1'].to_numpy(dtype=np.int64).astype('datetime64[D]'),
+                                 date_2=conflicts['date_2'].to_numpy(dtype=np.int64).astype('datetime64[D]'))
+    conflicts = conflicts.astype({'date_1': 'datetime64[ns]', 'date_2': 'datetime64[ns]'})
+    return conflicts.assign(days_apart=(conflicts['date_2'] - conflicts['date_1']).dt.days)
+
+
 def main():
-    msg = 'Create a meeting schedule from a list of names.'
-    parser = argparse.ArgumentParser(description=msg)
-    parser.add_argument('-n', '--names', help='"names, separated by commas"')
-    parser.add_argument('-s', '--start', help='start date (str)')
-    parser.add_argument('-e', '--end', help='end date (str)')
-    args = parser.parse_args()
-    names = args.names.split(',')
-    # Remove space before the names
-    names = [name.lstrip() for name in names]
-    cal = Meetings(name_list=names).create_timeboard(start_date=args.start, end_date=args.end)
-    # Print the schedule (we could also save it, but here, just show it
-    print(cal)
+    """ Command line entry point, see :mod:`cadence.cli` """
+    from cadence.cli import main as cli_main
+    cli_main()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
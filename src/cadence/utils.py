@@ -9,25 +9,233 @@ from __future__ import annotations
 import os
 import shutil
 import contextlib
+import hashlib
+import json
+import threading
+import time
 import traceback
 import gzip
+import bz2
+import io
+import lzma
+import tarfile
+import zipfile
 import random
+import re
 import numpy as np
 import pandas as pd
 import logging
+import http.client
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import NamedTuple
 from urllib import request
 from urllib.error import HTTPError
-from faker import Faker
-from tqdm import tqdm
+from urllib.parse import urljoin, urlparse
 
 logger = logging.getLogger(__name__)
 
-class DownloadProgressBar(tqdm):
-    """ Small helper class to make a download bar """
-    def update_to(self, b=1, bsize=1, tsize=None):
-        if tsize is not None:
-            self.total = tsize
-        self.update(b * bsize - self.n)
+BASE_EXT_LIST = ['.json', '.csv', '.pickle', '.parquet', '.ckpt', '.pth', '.xlsx']
+
+# Compressed single files
+COMPRESSED_OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+# Archives with several files, longest extensions first
+ARCHIVE_EXT_LIST = ['.tar.gz', '.tar.bz2', '.tar.xz', '.tgz', '.tbz2', '.txz', '.tar', '.zip']
+
+def compression_ext(file_name):
+    """
+    Extension of a compressed file or archive
+    :param file_name: file name or path
+    :return: archive extension from ARCHIVE_EXT_LIST, compression extension from COMPRESSED_OPENERS, or None
+    """
+    file_name = file_name.lower()
+    for xt in ARCHIVE_EXT_LIST + list(COMPRESSED_OPENERS):
+        if file_name.endswith(xt):
+            return xt
+    return None
+
+def extract_tar(tar, out_dir):
+    """
+    Extract a tar archive with the 'data' filter, which rejects absolute paths and links outside out_dir
+    :param tar: open tarfile.TarFile, also in stream mode
+    :param out_dir: output directory
+    """
+    if hasattr(tarfile, 'data_filter'):
+        tar.extractall(out_dir, filter='data')
+    else:
+        tar.extractall(out_dir)
+
+class FetchResult(NamedTuple):
+    """ Response headers and SHA-256 digest and size of a downloaded file """
+    headers: dict
+    sha256: str
+    size: int
+
+class UrlSize(NamedTuple):
+    """ Size of the file at a URL: the size is None if the server did not report it, the error is set if the request failed """
+    url: str
+    size: int
+    error: Exception
+
+class DownloadResult(NamedTuple):
+    """ Result of a download from a URL: the output file, or the error if the download failed """
+    url: str
+    file: str
+    error: Exception
+
+def file_sha256(file, chunk_size=1 << 20):
+    """
+    SHA-256 digest of a file
+    :param file: complete file path
+    :param chunk_size: number of bytes read at a time
+    :return: hex digest (str)
+    """
+    digest = hashlib.sha256()
+    with open(file, 'rb') as fl:
+        for chunk in iter(lambda: fl.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class DownloadCache:
+    """
+    Index of downloaded files for revalidation with conditional GET requests.
+
+    The index is a JSON sidecar file in the cache directory.
+    For each URL, it stores the file name, the ETag and Last-Modified headers of the response,
+    the SHA-256 digest and size of the file and the time of the last access.
+    A cached file is only revalidated if it still has the recorded digest,
+    otherwise it is downloaded again.
+
+    Parameters:
+    - cache_dir (str): The directory with the downloaded files and the index.
+    - max_bytes (Optional[int]): Maximum total size of the cached files.
+      The least recently used files are deleted when the cache is larger. Default is None (no limit).
+
+    Methods:
+    - request_headers(url: str, output_file: str) -> dict: Conditional request headers for a cached file.
+    - add(url: str, output_file: str, response_headers: dict): Add a downloaded file to the index.
+    - touch(url: str): Mark a cached file as used.
+    - evict(keep: Optional[str]) -> List[str]: Delete the least recently used files above the size limit.
+    """
+    index_file_name = '.cadence_cache.json'
+
+    def __init__(self, cache_dir, max_bytes=None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_file = os.path.join(cache_dir, self.index_file_name)
+        self._lock = threading.Lock()
+        self.index = {}
+        if os.path.isfile(self.index_file):
+            try:
+                with open(self.index_file) as fl:
+                    self.index = json.load(fl)
+            except (OSError, ValueError) as e:
+                logger.warning(f'Cache index {self.index_file} could not be read: {e}')
+
+    def save(self):
+        """ Write the index to the sidecar file """
+        tmp_file = f'{self.index_file}.tmp'
+        with open(tmp_file, 'w') as fl:
+            json.dump(self.index, fl, indent=1)
+        os.replace(tmp_file, self.index_file)
+
+    def request_headers(self, url, output_file):
+        """
+        Conditional request headers for a cached file
+        :param url: cloud storage location URL
+        :param output_file: complete file path of the output file
+        :return: dictionary with If-None-Match and If-Modified-Since headers,
+        or an empty dictionary if the file is not in the cache or was changed.
+        """
+        with self._lock:
+            entry = self.index.get(url)
+        if entry is None or entry.get('file') != os.path.basename(output_file) or not os.path.isfile(output_file):
+            return {}
+        if os.path.getsize(output_file) != entry.get('size') or file_sha256(output_file) != entry.get('sha256'):
+            logger.info(f'Cached file changed: {output_file}')
+            return {}
+        headers = {}
+        if entry.get('etag') is not None:
+            headers['If-None-Match'] = entry.get('etag')
+        if entry.get('last_modified') is not None:
+            headers['If-Modified-Since'] = entry.get('last_modified')
+        return headers
+
+    def add(self, url, output_file, response_headers, sha256=None):
+        """
+        Add a downloaded file to the index and evict files above the size limit
+        :param url: cloud storage location URL
+        :param output_file: complete file path of the downloaded file
+        :param response_headers: dictionary with the response headers
+        :param sha256: SHA-256 hex digest of the file, computed from the file if None
+        """
+        entry = {'file': os.path.basename(output_file),
+                 'etag': response_headers.get('ETag'),
+                 'last_modified': response_headers.get('Last-Modified'),
+                 'sha256': file_sha256(output_file) if sha256 is None else sha256,
+                 'size': os.path.getsize(output_file),
+                 'last_access': time.time()}
+        with self._lock:
+            self.index[url] = entry
+            self.evict(keep=url)
+            self.save()
+
+    def touch(self, url):
+        """ Mark the cached file of a URL as used """
+        with self._lock:
+            if url in self.index:
+                self.index[url]['last_access'] = time.time()
+                self.save()
+
+    def evict(self, keep=None):
+        """
+        Delete the least recently used files until the cache is not larger than max_bytes
+        :param keep: URL that is not evicted
+        :return: list of URLs that were removed from the cache
+        """
+        removed = []
+        if self.max_bytes is None:
+            return removed
+        total = sum(entry.get('size', 0) for entry in self.index.values())
+        for url, entry in sorted(self.index.items(), key=lambda item: item[1].get('last_access', 0)):
+            if total <= self.max_bytes:
+                break
+            if url == keep:
+                continue
+            file = os.path.join(self.cache_dir, entry.get('file'))
+            if os.path.isfile(file):
+                os.unlink(file)
+            total -= entry.get('size', 0)
+            removed.append(url)
+            logger.info(f'Evicted {file} from the cache.')
+        for url in removed:
+            self.index.pop(url)
+        return removed
+
+@lru_cache(maxsize=None)
+def download_progress_bar():
+    """
+    Creates the progress bar class for downloads.
+    tqdm is imported on the first call, so that importing this module does not import it.
+
+    :return: The DownloadProgressBar class, a subclass of tqdm.tqdm.
+    """
+    from tqdm import tqdm
+
+    class DownloadProgressBar(tqdm):
+        """ Small helper class to make a download bar """
+        def update_to(self, b=1, bsize=1, tsize=None):
+            if tsize is not None:
+                self.total = tsize
+            self.update(b * bsize - self.n)
+
+    return DownloadProgressBar
+
+def __getattr__(name):
+    # DownloadProgressBar is created when it is first used
+    if name == 'DownloadProgressBar':
+        return download_progress_bar()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 class FileOP:
     """
@@ -41,10 +249,16 @@ class FileOP:
     - url (None or str): The URL of the file to download.
 
     Methods:
-    - unzip(in_file: str, out_file: str) -> int: Unzips a .gz file and returns the file size.
+    - unzip(in_file: str, out_file: str) -> int: Unzips a .gz, .bz2 or .xz file and returns the file size.
+    - extract_archive(in_file: str, out_dir: str) -> str: Extracts a .zip or .tar archive.
+    - stream_extract(url: str, download_dir: str) -> str: Downloads and decompresses a file in one pass.
+    - open_url(url: str) -> ContextManager: Opens a URL as a decompressed file object.
+    - read_url(url: str, reader: Callable) -> Any: Reads a URL with a pandas or pyarrow reader.
     - file_size_from_url(url: str) -> int: Gets the size of a file without downloading it.
+    - file_sizes_from_urls(urls: List[str]) -> List[UrlSize]: Gets the sizes of many files concurrently.
     - download_from_url(url: str, download_dir: str, extract: bool = True, delete_after_extract: bool = False, ext_list: Optional[List[str]] = None) -> str: Downloads a file from a URL and
     * returns the file path.
+    - download_many(urls: List[str], download_dir: str, ..., max_workers: int = 8) -> List[DownloadResult]: Downloads files from many URLs concurrently.
 
     """
     def __init__(self, data_output_dir=None):
@@ -53,18 +267,20 @@ class FileOP:
 
     def unzip(self, in_file, out_file):
         """
-        Unzip .gz file and return file size
-        :param in_file: complete file path of compressed .gz file
+        Unzip .gz, .bz2 or .xz file and return file size
+        :param in_file: complete file path of compressed file. Files without .bz2 or .xz extension are read as .gz.
         :param out_file: complete file path of output file
         :return: os.path.getsize(out_file) in bytes
         """
         if not os.path.isfile(out_file):
+            xt = compression_ext(in_file)
+            opener = COMPRESSED_OPENERS.get(xt, gzip.open)
             try:
-                with gzip.open(in_file, 'rb') as f_in, open(out_file, 'wb') as f_out:
+                with opener(in_file, 'rb') as f_in, open(out_file, 'wb') as f_out:
                     shutil.copyfileobj(f_in, f_out)
             except Exception as e:
-                logger.error(f'gzip failed on file: {in_file}: {e}')
-                print(f'gzip failed on file: {in_file}: {e}')
+                logger.error(f'{xt} extraction failed on file: {in_file}: {e}')
+                print(f'{xt} extraction failed on file: {in_file}: {e}')
                 file_size = None
             else:
                 file_size = os.path.getsize(out_file)
@@ -73,77 +289,449 @@ class FileOP:
             file_size = os.path.getsize(out_file)
         return file_size
 
+    def extract_archive(self, in_file, out_dir):
+        """
+        Extract all files from a .zip or .tar archive
+        :param in_file: complete file path of the archive
+        :param out_dir: output directory
+        :return: out_dir, or None if the extraction failed
+        """
+        try:
+            if compression_ext(in_file) == '.zip':
+                with zipfile.ZipFile(in_file) as zf:
+                    zf.extractall(out_dir)
+            else:
+                with tarfile.open(in_file, mode='r:*') as tar:
+                    extract_tar(tar, out_dir)
+        except Exception as e:
+            logger.error(f'Extraction failed on file: {in_file}: {e}')
+            print(f'Extraction failed on file: {in_file}: {e}')
+            return None
+        return out_dir
+
+    def stream_extract(self, url, download_dir, chunk_size=1 << 20):
+        """
+        Download a compressed file and decompress it while the data arrives
+        :param url: cloud storage location URL of a .gz, .bz2, .xz, .tar.* or .zip file
+        :param download_dir: path-like object representing file path.
+        :param chunk_size: number of bytes decompressed at a time
+        :return: file path of the decompressed file, or directory with the files of a .tar or .zip archive.
+        Only the decompressed data is written to disk. A .zip archive has its table of contents at the end,
+        so it is downloaded first, then extracted and deleted. If the extraction fails,
+        the .zip file is kept and None is returned.
+        Files that are not compressed are downloaded as they are.
+        """
+        file_name = os.path.basename(urlparse(url).path)
+        xt = compression_ext(file_name)
+        output_file = os.path.join(download_dir, file_name)
+        if xt is None:
+            self.fetch(url, output_file=output_file, chunk_size=chunk_size)
+            return output_file
+        output_path = output_file[:-len(xt)]
+        if xt == '.zip':
+            self.fetch(url, output_file=output_file, chunk_size=chunk_size)
+            output_path = self.extract_archive(in_file=output_file, out_dir=output_path)
+            # Keep the archive if the extraction failed, so that it can be inspected
+            if output_path is not None:
+                os.unlink(output_file)
+            return output_path
+        with contextlib.closing(request.urlopen(url)) as response:
+            if xt in COMPRESSED_OPENERS:
+                part_file = f'{output_path}.part'
+                with COMPRESSED_OPENERS[xt](response, 'rb') as f_in, open(part_file, 'wb') as f_out:
+                    shutil.copyfileobj(f_in, f_out, chunk_size)
+                os.replace(part_file, output_path)
+            else:
+                with tarfile.open(fileobj=response, mode='r|*') as tar:
+                    extract_tar(tar, output_path)
+        logger.info(f'Extracted {url} to {output_path}')
+        return output_path
+
+    @contextlib.contextmanager
+    def open_url(self, url, member=None):
+        """
+        Open a URL as a binary file object with the decompressed data, without writing files to disk
+        :param url: cloud storage location URL of a plain, .gz, .bz2, .xz or .zip file
+        :param member: name of the file in a .zip archive. Default is the first file.
+        :return: context manager with a file object that can be passed to pandas or pyarrow readers.
+        A .zip archive is held in memory in compressed form, because it can only be read from a seekable file.
+        """
+        xt = compression_ext(os.path.basename(urlparse(url).path))
+        if xt is not None and xt != '.zip' and xt not in COMPRESSED_OPENERS:
+            raise ValueError(f'Cannot open {xt} archive as one file. Use stream_extract.')
+        with contextlib.closing(request.urlopen(url)) as response:
+            if xt in COMPRESSED_OPENERS:
+                with COMPRESSED_OPENERS[xt](response, 'rb') as fl:
+                    yield fl
+            elif xt == '.zip':
+                with zipfile.ZipFile(io.BytesIO(response.read())) as zf:
+                    member = zf.namelist()[0] if member is None else member
+                    with zf.open(member) as fl:
+                        yield fl
+            else:
+                yield response
+
+    def read_url(self, url, reader=None, **kwargs):
+        """
+        Read a file from a URL with a pandas or pyarrow reader, decompressing while the data arrives
+        :param url: cloud storage location URL of a plain, .gz, .bz2, .xz or .zip file
+        :param reader: function that reads from a file object, such as pd.read_csv or pyarrow.csv.read_csv.
+        Default is pd.read_csv.
+        :param kwargs: keyword arguments for the reader
+        :return: output of the reader
+        """
+        reader = pd.read_csv if reader is None else reader
+        with self.open_url(url) as fl:
+            return reader(fl, **kwargs)
+
     def file_size_from_url(self, url):
         """
         Method to acquire size of a file without download
         :param: url
-        :returns: size in bytes (int)
+        :returns: size in bytes (int), or np.nan if the size is unknown or the request failed
         """
         url_size = np.nan
+        result = self.file_sizes_from_urls([url])[0]
+        if isinstance(result.error, HTTPError):
+            logger.error(f'ERROR: {result.error}: URL: {url}')
+        elif result.error is not None:
+            logger.error(f'ERROR {result.error}: URL: {url}')
+        elif result.size is not None:
+            url_size = result.size
+        return url_size
+
+    def file_sizes_from_urls(self, urls, max_workers=8, connections_per_host=4, timeout=30):
+        """
+        Acquire the sizes of many files without download.
+        Each size is requested with HEAD, or with a GET request for the first byte if HEAD is not allowed.
+        The URLs of each host are split over up to connections_per_host persistent connections,
+        which run concurrently in a pool of threads.
+        :param urls: list of URLs
+        :param max_workers: maximum number of concurrent connections
+        :param connections_per_host: maximum number of connections to one host
+        :param timeout: timeout of the requests in seconds
+        :return: list of UrlSize(url, size, error) in the order of the URLs
+        """
+        # Group the URL positions by host
+        hosts = {}
+        for pos, url in enumerate(urls):
+            parts = urlparse(url)
+            hosts.setdefault((parts.scheme, parts.netloc), []).append(pos)
+        tasks = []
+        for (scheme, netloc), positions in hosts.items():
+            n_connections = max(1, min(connections_per_host, len(positions)))
+            tasks.extend([(scheme, netloc, positions[idx::n_connections]) for idx in range(n_connections)])
+        results = [None] * len(urls)
+
+        def probe_urls(scheme, netloc, positions):
+            conn = None
+            for pos in positions:
+                try:
+                    # A URL with an unsupported scheme fails here, without stopping the other URLs
+                    if conn is None:
+                        conn = self._connection(scheme, netloc, timeout)
+                    results[pos] = UrlSize(url=urls[pos], size=self._probe_size(conn, urls[pos], timeout), error=None)
+                except Exception as e:
+                    results[pos] = UrlSize(url=urls[pos], size=None, error=e)
+                    # Start with a new connection after an error
+                    if conn is not None:
+                        conn.close()
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for future in [executor.submit(probe_urls, *task) for task in tasks]:
+                future.result()
+        return results
+
+    @staticmethod
+    def _content_length(response):
+        """ Content-Length header of a response as int, or None if missing """
+        length = response.getheader('Content-Length')
+        return int(length) if length is not None and length.isdigit() else None
+
+    @staticmethod
+    def _connection(scheme, netloc, timeout):
+        """ HTTP or HTTPS connection to a host """
+        if scheme == 'https':
+            return http.client.HTTPSConnection(netloc, timeout=timeout)
+        if scheme == 'http':
+            return http.client.HTTPConnection(netloc, timeout=timeout)
+        raise ValueError(f'Unsupported URL scheme: {scheme}')
+
+    def _probe_size(self, conn, url, timeout, max_redirects=5):
+        """
+        Size of the file at a URL from a HEAD request, or from a GET request for the first byte
+        :param conn: open HTTP connection to the host of the URL
+        :param url: URL
+        :param timeout: timeout of the requests in seconds for redirects to other hosts
+        :param max_redirects: maximum number of redirects to follow
+        :return: size in bytes (int), or None if the server does not report the size
+        """
+        parts = urlparse(url)
+        path = parts.path or '/'
+        if parts.query:
+            path = f'{path}?{parts.query}'
+        conn.request('HEAD', path)
+        response = conn.getresponse()
+        response.read()
+        if response.status in [405, 501] or (response.status == 200 and self._content_length(response) is None):
+            # HEAD is not allowed or has no size, so we ask for the first byte
+            conn.request('GET', path, headers={'Range': 'bytes=0-0'})
+            response = conn.getresponse()
+            if response.status == 206:
+                response.read()
+                total = response.getheader('Content-Range', '').rsplit('/', maxsplit=1)[-1]
+                return int(total) if total.isdigit() else None
+            # The server ignored the range, so we close the connection instead of reading the file
+            size = self._content_length(response)
+            conn.close()
+            if response.status == 200:
+                return size
+        if response.status in [301, 302, 303, 307, 308] and max_redirects > 0:
+            location = urljoin(url, response.getheader('Location'))
+            location_parts = urlparse(location)
+            redirect_conn = self._connection(location_parts.scheme, location_parts.netloc, timeout)
+            with contextlib.closing(redirect_conn):
+                return self._probe_size(redirect_conn, location, timeout, max_redirects=max_redirects - 1)
+        if response.status >= 400 or response.status < 200:
+            raise HTTPError(url, response.status, response.reason, response.headers, None)
+        return self._content_length(response)
+
+    @staticmethod
+    def output_file_name(url, ext_list=None):
+        """
+        File name of the downloaded file for a URL
+        :param url: cloud storage location URL
+        :param ext_list: list of allowed extensions. Anything after the extension in the URL is removed.
+        :return: file name
+        """
+        output_file_name = os.path.basename(url)
+        if ext_list is None:
+            ext_list = BASE_EXT_LIST
+        ext_in_url = [xt for xt in ext_list if xt in url]
+        if len(ext_in_url) > 0:
+            xt = ext_in_url[0]
+            output_file_name = f'{output_file_name.split(xt, maxsplit=1)[0]}{xt}'
+        return output_file_name
+
+    def fetch(self, url, output_file, reporthook=None, headers=None, chunk_size=1 << 20, sha256=None, resume=True):
+        """
+        Download a URL to a file in chunks. Errors are raised, not logged.
+        The data is written to output_file + '.part', which is renamed to output_file when it is complete.
+        A .part file from an interrupted download is resumed with an HTTP Range request.
+        The ETag or Last-Modified header of the first response is saved in output_file + '.part.json'
+        and sent as If-Range, so the download starts from the beginning if the file changed on the server,
+        if the server does not support Range requests, or if there is no validator for the .part file.
+        :param url: cloud storage location URL
+        :param output_file: complete file path of the output file
+        :param reporthook: optional callback(block_number, block_size, total_size) for the progress,
+        where block_number * block_size is the number of bytes in the file.
+        :param headers: optional dictionary with request headers
+        :param chunk_size: number of bytes read at a time
+        :param sha256: optional expected SHA-256 hex digest of the file. If the digest is different,
+        the .part file is deleted and a ValueError is raised.
+        :param resume: resume an existing .part file
+        :return: FetchResult(headers, sha256, size) with the response headers and the digest and size of the file,
+        or None if the server responded with 304 Not Modified to a conditional request.
+        """
+        part_file = f'{output_file}.part'
+        validator_file = f'{part_file}.json'
+        offset, validator = 0, None
+        if resume and os.path.isfile(part_file) and os.path.isfile(validator_file):
+            with open(validator_file) as fl:
+                validator = json.load(fl).get('If-Range')
+            offset = os.path.getsize(part_file) if validator else 0
+        request_headers = dict(headers or {})
+        if offset > 0:
+            request_headers['Range'] = f'bytes={offset}-'
+            request_headers['If-Range'] = validator
+
+        def restart():
+            """ Deletes the .part file and downloads the file from the beginning """
+            for file in [part_file, validator_file]:
+                if os.path.exists(file):
+                    os.unlink(file)
+            return self.fetch(url, output_file, reporthook=reporthook, headers=headers, chunk_size=chunk_size,
+                              sha256=sha256, resume=False)
+
         try:
-            with contextlib.closing(request.urlopen(url)) as ul:
-                url_size = ul.length
+            response = request.urlopen(request.Request(url, headers=request_headers))
         except HTTPError as http_err:
-            logger.error(f'ERROR: {http_err}: URL: {url}')
-        except Exception as e:
-            logger.error(f'ERROR {e}: URL: {url}')
-        return url_size
+            if http_err.code == 304:
+                return None
+            if http_err.code != 416 or offset == 0:
+                raise
+            # The .part file does not match the file on the server, so we start again
+            return restart()
+        with contextlib.closing(response):
+            digest = hashlib.sha256()
+            if response.status == 206:
+                content_range = re.match(r'bytes (\d+)-', response.headers.get('Content-Range', ''))
+                if offset == 0 or content_range is None or int(content_range.group(1)) != offset:
+                    # The server did not send the rest of the .part file
+                    response.close()
+                    return restart()
+                logger.info(f'Resuming download at byte {offset}: {output_file}')
+                mode = 'ab'
+                # The digest includes the bytes from the interrupted download
+                with open(part_file, 'rb') as f_part:
+                    for chunk in iter(lambda: f_part.read(chunk_size), b''):
+                        digest.update(chunk)
+            else:
+                mode = 'wb'
+                offset = 0
+                # Save the validator of this version of the file, to resume only the same version
+                validator = self._range_validator(response.headers)
+                if validator is not None:
+                    with open(validator_file, 'w') as fl:
+                        json.dump({'If-Range': validator}, fl)
+                elif os.path.exists(validator_file):
+                    os.unlink(validator_file)
+            total_size = offset + response.length if response.length is not None else -1
+            size = offset
+            if reporthook is not None:
+                reporthook(1, size, total_size)
+            with open(part_file, mode) as f_out:
+                for chunk in iter(lambda: response.read(chunk_size), b''):
+                    f_out.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+                    if reporthook is not None:
+                        reporthook(1, size, total_size)
+            if total_size >= 0 and size != total_size:
+                raise IOError(f'Download incomplete: {size} of {total_size} bytes. Partial file: {part_file}')
+            if sha256 is not None and digest.hexdigest() != sha256.lower():
+                os.unlink(part_file)
+                if os.path.exists(validator_file):
+                    os.unlink(validator_file)
+                raise ValueError(f'SHA-256 digest {digest.hexdigest()} of {url} does not match {sha256}.')
+            os.replace(part_file, output_file)
+            if os.path.exists(validator_file):
+                os.unlink(validator_file)
+            return FetchResult(headers=dict(response.headers.items()), sha256=digest.hexdigest(), size=size)
+
+    @staticmethod
+    def _range_validator(headers):
+        """
+        Validator for the If-Range header of a resumed download
+        :param headers: response headers of the first request
+        :return: strong ETag, Last-Modified date or None
+        """
+        etag = headers.get('ETag')
+        # Weak ETags cannot be used with If-Range
+        if etag is not None and not etag.startswith('W/'):
+            return etag
+        return headers.get('Last-Modified')
+
+    def download(self, url, output_file, cache=None, reporthook=None, sha256=None):
+        """
+        Download a URL to a file, unless the file exists or the cached file is not modified.
+        Errors are raised, not logged.
+        :param url: cloud storage location URL
+        :param output_file: complete file path of the output file
+        :param cache: optional DownloadCache. Cached files are revalidated with a conditional request.
+        Without a cache, an existing file is not downloaded again.
+        :param reporthook: optional callback(block_number, block_size, total_size) for the progress
+        :param sha256: optional expected SHA-256 hex digest of the file
+        :return: True if the file was downloaded, False if the existing file was kept.
+        """
+        if cache is None:
+            if os.path.exists(output_file):
+                logger.info(f'File exists: {output_file}')
+                return False
+            self.fetch(url, output_file=output_file, reporthook=reporthook, sha256=sha256)
+            return True
+        result = self.fetch(url, output_file=output_file, reporthook=reporthook, sha256=sha256,
+                            headers=cache.request_headers(url, output_file))
+        if result is None:
+            logger.info(f'File not modified: {output_file}')
+            cache.touch(url)
+            return False
+        cache.add(url, output_file, result.headers, sha256=result.sha256)
+        return True
+
+    def extract(self, output_file, ext_list=None, delete_after_extract=False):
+        """
+        Extract a downloaded file if it is compressed
+        :param output_file: complete file path of the downloaded file
+        :param ext_list: list of allowed extensions
+        :param delete_after_extract: if file is an archive, delete file after extraction.
+        :return: file path of the extracted file, or output_file if there is nothing to extract
+        """
+        if ext_list is None:
+            ext_list = BASE_EXT_LIST
+        output_file_path = output_file
+        file_parts = os.path.splitext(output_file)
+        xt = file_parts[-1]
+        archive_xt = compression_ext(output_file)
+        if archive_xt in ARCHIVE_EXT_LIST:
+            print(f'Extracting from {archive_xt} archive.')
+            out_dir = output_file[:-len(archive_xt)]
+            if self.extract_archive(in_file=output_file, out_dir=out_dir) is not None:
+                output_file_path = out_dir
+                if delete_after_extract:
+                    os.unlink(output_file)
+                    logger.info(f'Deleted archive {output_file}')
+        elif xt in COMPRESSED_OPENERS:
+            print(f'Extracting from {xt} archive.')
+            out_file = file_parts[0]
+            file_size = self.unzip(in_file=output_file, out_file=out_file)
+            if file_size is not None:
+                output_file_path = out_file
+                if delete_after_extract:
+                    os.unlink(output_file)
+                    logger.info(f'Deleted compressed file {output_file}')
+        elif xt in ext_list:
+            print(f'Created {xt} file.')
+        else:
+            print(f'File: {xt} loaded.')
+            logger.warning(f'File extension is unexpected {xt}.')
+        return output_file_path
 
-    def download_from_url(self, url, download_dir, extract=True, delete_after_extract=False, ext_list=None):
+    def download_from_url(self, url, download_dir, extract=True, delete_after_extract=False, ext_list=None,
+                          cache=None, sha256=None):
         """
         :param url: cloud storage location URL
         :param download_dir: path-like object representing file path.
         :param extract: extract file if compressed
         :param delete_after_extract: if file is an archive, delete file after extraction.
         :param ext_list: list of allowed extensions, for example '.json.gz' or '.zip'
+        :param cache: DownloadCache, or True for a DownloadCache in download_dir without size limit.
+        With a cache, existing files are revalidated with the server and downloaded again if they changed.
+        :param sha256: expected SHA-256 hex digest of the downloaded file (optional)
         :return: file path of output file
         """
-        output_file_name = os.path.basename(url)
-        base_ext_list = ['.json', '.csv', '.pickle', '.parquet', '.ckpt', '.pth', '.xlsx']
         if ext_list is None:
-            ext_list = base_ext_list
-        if ext_list is not None:
-            ext_in_url = [xt for xt in ext_list if xt in url]
-            if len(ext_in_url) > 0:
-                xt = ext_in_url[0]
-                output_file_name = f'{output_file_name.split(xt, maxsplit=1)[0]}{xt}'
+            ext_list = BASE_EXT_LIST
+        output_file_name = self.output_file_name(url, ext_list=ext_list)
         output_file = os.path.join(download_dir, output_file_name)
         if os.path.exists(download_dir):
-            if not os.path.exists(output_file):
-                try:
-                    with DownloadProgressBar(unit='B', unit_scale=True, miniters=1, desc=output_file_name) as t:
-                        request.urlretrieve(url, filename=output_file, reporthook=t.update_to)
-                except HTTPError as http_err:
-                    print(http_err)
-                    logger.error(f'Download failed for URL: {url}'
-                                 f' {http_err}')
-                except Exception as e:
-                    traceback.print_exc()
-                    logger.error(f'Download failed for URL: {url}'
-                                 f' {e}')
-                else:
-                    logger.info(f'Download complete: {output_file}.')
+            if cache is True:
+                cache = DownloadCache(cache_dir=download_dir)
+            DownloadProgressBar = download_progress_bar()
+            try:
+                with DownloadProgressBar(unit='B', unit_scale=True, miniters=1, desc=output_file_name,
+                                         disable=cache is None and os.path.exists(output_file)) as t:
+                    downloaded = self.download(url, output_file=output_file, cache=cache or None,
+                                               reporthook=t.update_to, sha256=sha256)
+            except HTTPError as http_err:
+                print(http_err)
+                logger.error(f'Download failed for URL: {url}'
+                             f' {http_err}')
+            except Exception as e:
+                traceback.print_exc()
+                logger.error(f'Download failed for URL: {url}'
+                             f' {e}')
             else:
-                logger.info(f'File exists: {output_file}')
+                if downloaded:
+                    logger.info(f'Download complete: {output_file}.')
             # Unpacking
             output_file_path = output_file
             if os.path.exists(output_file) and extract:
-                file_parts = os.path.splitext(output_file)
-                xt = file_parts[-1]
-                if xt in ['.gz']:
-                    print(f'Extracting from {xt} archive.')
-                    out_file = file_parts[0]
-                    file_size = self.unzip(in_file=output_file, out_file=out_file)
-                    if file_size is not None:
-                        output_file_path = out_file
-                        if delete_after_extract:
-                            os.unlink(output_file)
-                            logger.info(f'Deleted compressed file {output_file}')
-                elif xt in ext_list:
-                    print(f'Created {xt} file.')
-                else:
-                    print(f'File: {xt} loaded.')
-                    logger.warning(f'File extension is unexpected {xt}.')
+                output_file_path = self.extract(output_file, ext_list=ext_list,
+                                                delete_after_extract=delete_after_extract)
             elif os.path.exists(output_file) and not extract:
                 output_file_path = output_file
         else:
@@ -151,6 +739,111 @@ class FileOP:
             output_file_path = None
         return output_file_path
 
+    def download_many(self, urls, download_dir, extract=True, delete_after_extract=False, ext_list=None,
+                      max_workers=8, cache=None, checksums=None):
+        """
+        Download files from many URLs in a pool of threads
+        :param urls: list of cloud storage location URLs
+        :param download_dir: path-like object representing file path.
+        :param extract: extract files if compressed
+        :param delete_after_extract: if a file is an archive, delete file after extraction.
+        :param ext_list: list of allowed extensions, for example '.json.gz' or '.zip'
+        :param max_workers: maximum number of concurrent downloads
+        :param cache: DownloadCache, or True for a DownloadCache in download_dir without size limit.
+        :param checksums: optional dictionary with the expected SHA-256 hex digest for URLs
+        :return: list of DownloadResult(url, file, error) in the order of the URLs.
+        The file is None and the error is the exception if the download of a URL failed.
+        Existing files are not downloaded again, or revalidated if there is a cache, as in download_from_url.
+        """
+        if ext_list is None:
+            ext_list = BASE_EXT_LIST
+        if not os.path.exists(download_dir):
+            raise FileNotFoundError(f'Output directory {download_dir} does not exist.')
+        if cache is True:
+            cache = DownloadCache(cache_dir=download_dir)
+
+        def download(url):
+            output_file = os.path.join(download_dir, self.output_file_name(url, ext_list=ext_list))
+            try:
+                if self.download(url, output_file=output_file, cache=cache or None,
+                                 sha256=(checksums or {}).get(url)):
+                    logger.info(f'Download complete: {output_file}.')
+                if extract:
+                    output_file = self.extract(output_file, ext_list=ext_list,
+                                               delete_after_extract=delete_after_extract)
+            except Exception as e:
+                logger.error(f'Download failed for URL: {url} {e}')
+                return DownloadResult(url=url, file=None, error=e)
+            return DownloadResult(url=url, file=output_file, error=None)
+
+        results = []
+        DownloadProgressBar = download_progress_bar()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+                DownloadProgressBar(total=len(urls), unit='file', desc='Downloads') as t:
+            futures = [executor.submit(download, url) for url in urls]
+            for future in as_completed(futures):
+                t.update(1)
+            results = [future.result() for future in futures]
+        return results
+
+ROSTER_SNAPSHOT_EXT = '.roster.parquet'
+
+def normalize_roster(table, email_col='email', name_col='name', group_col='group'):
+    """
+    Standard cleanup of a member roster with Arrow string functions:
+    small letters for the column names, emails and groups, first letter capitalized for names,
+    sorted by group and then name.
+    :param table: pyarrow.Table with the roster
+    :param email_col: email column (after lowercasing the column names)
+    :param name_col: name column
+    :param group_col: group column
+    :return: normalized pyarrow.Table
+    """
+    import pyarrow.compute as pc
+    table = table.rename_columns([str(col).lower() for col in table.column_names])
+    transforms = {email_col: pc.utf8_lower, group_col: pc.utf8_lower, name_col: pc.utf8_title}
+    for col, transform in transforms.items():
+        if col in table.column_names:
+            table = table.set_column(table.column_names.index(col), col, transform(table[col]))
+    sort_keys = [(col, 'ascending') for col in [group_col, name_col] if col in table.column_names]
+    if sort_keys:
+        table = table.sort_by(sort_keys)
+    return table
+
+def load_roster(member_file, snapshot_dir=None, sheet_name=0, refresh=False):
+    """
+    Load a normalized member roster from an Excel workbook.
+    The workbook is parsed once and saved as a Parquet snapshot next to it (or in snapshot_dir),
+    named after the SHA-256 hash of the workbook. Later calls read the snapshot
+    until the workbook changes. Snapshots of earlier versions of the workbook are removed.
+    :param member_file: complete path to the .xlsx file
+    :param snapshot_dir: directory for the Parquet snapshot, defaults to the directory of the workbook
+    :param sheet_name: sheet with the roster
+    :param refresh: parse the workbook even if a snapshot exists
+    :return: pd.DataFrame with the normalized roster
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    snapshot_dir = snapshot_dir or os.path.dirname(os.path.abspath(member_file))
+    stem = os.path.splitext(os.path.basename(member_file))[0]
+    sheet_key = hashlib.sha256(str(sheet_name).encode()).hexdigest()[:8]
+    key = f'{file_sha256(member_file)[:16]}-{sheet_key}'
+    snapshot_file = os.path.join(snapshot_dir, f'{stem}-{key}{ROSTER_SNAPSHOT_EXT}')
+    if os.path.exists(snapshot_file) and not refresh:
+        logger.debug(f'Roster snapshot: {snapshot_file}')
+        return pq.read_table(snapshot_file).to_pandas()
+    roster = pd.read_excel(member_file, sheet_name=sheet_name)
+    table = normalize_roster(pa.Table.from_pandas(roster, preserve_index=False))
+    os.makedirs(snapshot_dir, exist_ok=True)
+    stale_pattern = re.compile(f'{re.escape(stem)}-[0-9a-f]{{16}}-{sheet_key}{re.escape(ROSTER_SNAPSHOT_EXT)}')
+    for file_name in os.listdir(snapshot_dir):
+        if stale_pattern.fullmatch(file_name):
+            os.remove(os.path.join(snapshot_dir, file_name))
+    # Write to a temporary file so that an interrupted run does not leave a partial snapshot
+    pq.write_table(table, f'{snapshot_file}.part')
+    os.replace(f'{snapshot_file}.part', snapshot_file)
+    return table.to_pandas()
+
 class GroupFaker:
     """
 
@@ -160,11 +853,14 @@ class GroupFaker:
     - :meth:`__init__`: Initializes a new instance of the `GroupFaker` class.
     - :meth:`make_random_groups`: Creates random groups from a given list of members.
     - :meth:`create_fake_research_group`: Creates a DataFrame with fake research groups.
+    - :meth:`create_bulk_research_group`: Creates large DataFrames with fake research groups using vectorized sampling.
 
     """
     def __init__(self, n_members: int, n_groups: int, seed=123):
         self.n_members = n_members
         self.n_groups = n_groups
+        # Faker is slow to import, so it is only imported when fake data is needed
+        from faker import Faker
         self.fake = Faker()
         self.seed = seed
         Faker.seed(seed)
@@ -186,10 +882,12 @@ class GroupFaker:
 
         Note:
             - The number of groups is determined by the `n_groups` property of the object calling this method.
-            - The order of the members in the input list is randomized before assigning them to groups.
+            - The order of the members is randomized before assigning them to groups. The input list is not changed.
             - If the number of members is not divisible by the number of groups, the last group may have fewer members.
         """
         random.seed(self.seed)
+        # Shuffle a copy so that the list of the caller is not changed
+        member_list = list(member_list)
         random.shuffle(member_list)
         all_groups = []
         for index in range(self.n_groups):
@@ -209,7 +907,8 @@ class GroupFaker:
         """
         name_list = [self.fake.name() for n in range(self.n_members)]
         name_df = pd.DataFrame({'name': name_list})
-        name_df[['first_name', 'last_name']] = name_df['name'].str.split(' ', expand=True)
+        # Names with a prefix or suffix have more than two parts, so we split at the first space only
+        name_df[['first_name', 'last_name']] = name_df['name'].str.split(' ', n=1, expand=True)
         # Randomly assign members to groups
         name_df = name_df.assign(group=None)
         group_list = self.make_random_groups(member_list=name_df['name'].unique().tolist())
@@ -218,3 +917,40 @@ class GroupFaker:
         name_df = name_df.sort_values(by=['group', 'name'], ascending=True).reset_index(drop=True)
         return name_df
 
+    def _name_weights(self, attr: str) -> tuple:
+        """
+        Names and sampling probabilities from the person provider of Faker
+        :param attr: provider attribute, 'first_names' or 'last_names'
+        :return: (np.ndarray of names, np.ndarray of probabilities or None for uniform sampling)
+        """
+        provider = next(p for p in self.fake.get_providers() if hasattr(p, attr))
+        names = getattr(provider, attr)
+        if isinstance(names, dict):
+            weights = np.fromiter(names.values(), dtype=float, count=len(names))
+            return np.array(list(names.keys()), dtype=object), weights / weights.sum()
+        return np.array(list(dict.fromkeys(names)), dtype=object), None
+
+    def create_bulk_research_group(self) -> pd.DataFrame:
+        """
+        Creates a large fake research group with vectorized sampling.
+        First and last names are drawn from the name lists of Faker with a seeded NumPy generator,
+        and the shuffled unique names are assigned to groups by array slicing.
+        The names differ from :meth:`create_fake_research_group`, but the columns are the same.
+
+        :return: A pandas DataFrame with the columns name, first_name, last_name and group
+        """
+        rng = np.random.default_rng(self.seed)
+        first_names, first_p = self._name_weights('first_names')
+        last_names, last_p = self._name_weights('last_names')
+        first_name = first_names[rng.choice(len(first_names), size=self.n_members, p=first_p)]
+        last_name = last_names[rng.choice(len(last_names), size=self.n_members, p=last_p)]
+        name_df = pd.DataFrame({'first_name': first_name, 'last_name': last_name})
+        name_df.insert(0, 'name', name_df['first_name'] + ' ' + name_df['last_name'])
+        # Members with the same name are in the same group, as in create_fake_research_group
+        codes, unique_names = pd.factorize(name_df['name'])
+        unique_groups = np.empty(len(unique_names), dtype=np.int64)
+        unique_groups[rng.permutation(len(unique_names))] = np.arange(len(unique_names)) % self.n_groups
+        group_labels = np.array([f'group_{group}' for group in range(self.n_groups)], dtype=object)
+        name_df['group'] = group_labels[unique_groups[codes]]
+        name_df = name_df.sort_values(by=['group', 'name'], ascending=True).reset_index(drop=True)
+        return name_df
@@ -0,0 +1,39 @@
+""" test the command line interface """
+
+__author__ = "Andreas Werdich"
+__copyright__ = "Core for Computational Biomedicine at Harvard Medical School"
+__license__ = "CC0-1.0"
+
+import os
+import subprocess
+import sys
+import pandas as pd
+from tempfile import TemporaryDirectory
+from cadence.cli import main
+
+
+def test_lazy_imports():
+    """ Importing the package does not import pandas, and importing cadence.utils does not import tqdm or faker """
+    code = 'import sys, cadence; print("pandas" in sys.modules)'
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
+    code = 'import sys, cadence.utils; print("tqdm" in sys.modules, "faker" in sys.modules)'
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False False'
+
+
+def test_manifest():
+    """ Create all schedules from a CSV manifest """
+    with TemporaryDirectory() as manifest_dir:
+        manifest_file = os.path.join(manifest_dir, 'jobs.csv')
+        jobs = pd.DataFrame({'names': ['Ann, Bob, Cat', 'Dan, Eve'],
+                             'groups': ['a, b, a', None],
+                             'start': ['2025-01-01', '2025-01-06'],
+                             'end': ['2025-03-31', '2025-06-30'],
+                             'meeting_day': [2, 0],
+                             'output': [os.path.join(manifest_dir, f'schedule_{idx}.csv') for idx in range(2)]})
+        jobs.to_csv(manifest_file, index=False)
+        main(['--manifest', manifest_file])
+        schedules = [pd.read_csv(output) for output in jobs['output']]
+        assert [len(cal) for cal in schedules] == [13, 26]
+        assert schedules[1]['name'].tolist()[:3] == ['Dan', 'Eve', 'Dan']
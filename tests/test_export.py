@@ -0,0 +1,109 @@
+""" test the export module """
+
+__author__ = "Andreas Werdich"
+__copyright__ = "Core for Computational Biomedicine at Harvard Medical School"
+__license__ = "CC0-1.0"
+
+import os
+from itertools import islice
+from tempfile import TemporaryDirectory
+import pandas as pd
+import pyarrow as pa
+import pytest
+from cadence.cli import main
+from cadence.export import write_arrow, write_ics, write_parquet, write_schedule
+from cadence.mscheduler import Meetings, chunk_schedule
+
+pytestmark = pytest.mark.filterwarnings('ignore::FutureWarning')
+
+
+@pytest.fixture
+def meet():
+    """ Meetings instance with groups """
+    return Meetings(name_list=['Ann Lee', 'Bob', 'Cat', 'Dan'], group_list=['a, b', 'b', 'a', 'b'])
+
+
+def test_write_ics(meet):
+    cal = meet.create_timeboard(start_date='2025-01-01', end_date='2025-12-31', engine='numpy')
+    cal = meet.skip_dates(cal, [('2025-11-26', 'Thanksgiving week; no meeting')])
+    with TemporaryDirectory() as export_dir:
+        ics_file = os.path.join(export_dir, 'schedule.ics')
+        assert write_ics(cal, ics_file, chunk_size=10) == len(cal)
+        with open(ics_file, 'rb') as fl:
+            data = fl.read()
+    lines = data.split(b'\r\n')
+    assert lines[0] == b'BEGIN:VCALENDAR' and lines[-2] == b'END:VCALENDAR' and lines[-1] == b''
+    assert max(len(line) for line in lines) <= 75
+    unfolded = data.replace(b'\r\n ', b'').decode('utf-8')
+    assert unfolded.count('BEGIN:VEVENT') == len(cal)
+    assert 'DTSTART;VALUE=DATE:20251126\r\nDTEND;VALUE=DATE:20251127\r\nSUMMARY:Everyone' in unfolded
+    assert 'Comment: Thanksgiving week\\; no meeting' in unfolded and 'Group: a\\, b' in unfolded
+
+
+def test_write_compact(meet):
+    """ The day offsets of compact schedules are written as dates """
+    cal = meet.create_timeboard(start_date='2025-01-01', end_date='2025-12-31', engine='numpy')
+    compact = meet.to_compact(cal)
+    with TemporaryDirectory() as export_dir:
+        files = [os.path.join(export_dir, f'schedule{idx}.ics') for idx in range(2)]
+        write_ics(cal, files[0])
+        write_ics(compact, files[1], chunk_size=10)
+        events = []
+        for file in files:
+            with open(file) as fl:
+                events.append([line for line in fl.read().splitlines() if line.startswith('DTSTART')])
+        assert events[0] == events[1] and events[0][0] == 'DTSTART;VALUE=DATE:20250101'
+        csv_file = os.path.join(export_dir, 'schedule.csv')
+        write_schedule(compact, csv_file, chunk_size=20)
+        assert pd.read_csv(csv_file, parse_dates=['date'])['date'].tolist() == cal['date'].tolist()
+        # Integer dates without an epoch are rejected
+        offsets = compact.copy()
+        offsets.attrs = {}
+        with pytest.raises(ValueError):
+            write_parquet(offsets, os.path.join(export_dir, 'schedule.parquet'))
+
+
+@pytest.mark.parametrize('writer, reader', [(write_parquet, pd.read_parquet),
+                                            (write_arrow, lambda fl: pa.ipc.open_file(fl).read_pandas())])
+def test_write_columnar(meet, writer, reader):
+    compact = meet.create_timeboard(start_date='2025-01-01', end_date='2026-12-31', engine='numpy', compact=True)
+    with TemporaryDirectory() as export_dir:
+        export_file = os.path.join(export_dir, 'schedule')
+        assert writer(compact, export_file, chunk_size=30) == len(compact)
+        # The day offsets of the compact layout are stored as dates, the categorical columns are kept
+        expected = compact.assign(date=meet.from_compact(compact)['date']).reset_index(drop=True)
+        expected.attrs = {}
+        pd.testing.assert_frame_equal(reader(export_file), expected, check_categorical=True)
+        # Records from the lazy generator of a roster with more names than rows in a chunk,
+        # so that later chunks add new categories
+        roster = Meetings(name_list=[f'Person {idx:02d}' for idx in range(50, 0, -1)])
+        records = islice(roster.iter_schedule(start_date='2025-01-01'), 120)
+        assert writer(records, export_file, categorical=['name'], chunk_size=16) == 120
+        cal = reader(export_file)
+        expected = pd.concat(chunk_schedule(islice(roster.iter_schedule(start_date='2025-01-01'), 120),
+                                            chunk_size=16), ignore_index=True)
+        # The categories of each chunk are sorted and appended to the categories of the earlier chunks
+        categories = []
+        for start in range(0, 120, 16):
+            categories += sorted(set(expected['name'].iloc[start:start + 16]).difference(categories))
+        assert isinstance(cal['name'].dtype, pd.CategoricalDtype)
+        assert cal['name'].cat.categories.tolist() == categories
+        assert cal['date'].dtype == expected['date'].dtype
+        assert cal['name'].astype(object).tolist() == expected['name'].tolist()
+        pd.testing.assert_series_equal(cal['comment'], expected['comment'])
+        if writer is write_arrow:
+            # The names of the second to fourth chunk are added to the dictionary with deltas
+            with pa.ipc.open_file(export_file) as arrow_file:
+                arrow_file.read_all()
+                assert arrow_file.num_record_batches == 8
+                assert arrow_file.stats.num_dictionary_deltas == 3
+                assert arrow_file.stats.num_replaced_dictionaries == 0
+
+
+def test_cli_output(meet):
+    with TemporaryDirectory() as export_dir:
+        for xt in ['.ics', '.parquet', '.arrow']:
+            output = os.path.join(export_dir, f'schedule{xt}')
+            main(['--names', 'Ann, Bob', '--start', '2025-01-01', '--end', '2025-03-31', '--output', output])
+            assert os.path.getsize(output) > 0
+        assert len(pd.read_parquet(os.path.join(export_dir, 'schedule.parquet'))) == 13
@@ -0,0 +1,293 @@
+""" test the mscheduler module """
+
+__author__ = "Andreas Werdich"
+__copyright__ = "Core for Computational Biomedicine at Harvard Medical School"
+__license__ = "CC0-1.0"
+
+import holidays
+from itertools import chain, islice, takewhile
+import pandas as pd
+import pytest
+from cadence.mscheduler import (Meetings, ScheduleIndex, ScheduleState, chunk_schedule, find_conflicts,
+                                holiday_index, schedule_many, schedule_stats)
+from cadence.utils import GroupFaker
+
+pytestmark = pytest.mark.filterwarnings('ignore::FutureWarning')
+
+
+@pytest.fixture
+def meet():
+    """ Meetings instance with a fake research group """
+    name_df = GroupFaker(n_members=7, n_groups=3).create_fake_research_group()
+    return Meetings(name_list=list(name_df['name'].values), group_list=list(name_df['group'].values))
+
+
+@pytest.mark.parametrize('start_date, end_date, meeting_day', [('2025-01-01', '2026-12-31', 2),
+                                                               ('2025-01-02', '2025-03-10', 2),
+                                                               ('2024-12-29', '2025-07-04', 0),
+                                                               ('2025-05-01', '2025-05-03', 4),
+                                                               ('2025-05-01', '2025-05-31', 7)])
+def test_numpy_engine_parity(meet, start_date, end_date, meeting_day):
+    """ The numpy engine creates the same schedule as the timeboard engine """
+    start_name = meet.name_list[3]
+    cal_tb = meet.create_timeboard(start_date=start_date, end_date=end_date,
+                                   start_name=start_name, meeting_day=meeting_day)
+    cal_np = meet.create_timeboard(start_date=start_date, end_date=end_date,
+                                   start_name=start_name, meeting_day=meeting_day, engine='numpy')
+    pd.testing.assert_frame_equal(cal_np, cal_tb)
+
+
+@pytest.mark.parametrize('country, subdiv', [('US', 'MA'), ('US', 'CA'), ('DE', 'BY')])
+def test_holiday_index(meet, country, subdiv):
+    """ The cached holiday index agrees with the holidays library """
+    cal = meet.create_timeboard(start_date='2024-01-01', end_date='2027-12-31', meeting_day=0,
+                                engine='numpy', country=country, subdiv=subdiv)
+    country_holidays = holidays.country_holidays(country, subdiv=subdiv)
+    assert cal['holiday'].tolist() == [dt in country_holidays for dt in cal['date']]
+    assert cal['comment'].tolist() == [country_holidays.get(dt) for dt in cal['date']]
+    assert cal['holiday'].any()
+    index = holiday_index(years=(2025, 2025), country=country, subdiv=subdiv)
+    assert index.lookup(index.dates)[0].all()
+    assert len(index.dates) == len(holidays.country_holidays(country, subdiv=subdiv, years=2025))
+    with pytest.raises(TypeError):
+        holiday_index(country=country, subdiv=subdiv)
+
+
+def test_skip_dates(meet):
+    """ Skipping several dates at once is the same as skipping them one at a time """
+    cal = meet.create_timeboard(start_date='2025-01-01', end_date='2025-12-31', start_name=meet.name_list[2])
+    skips = [('2025-05-28', 'Retreat', 'Everyone'),
+             ('2025-02-12', 'Workshop', 'Guest speaker'),
+             ('2025-02-19', 'Workshop'),
+             ('2025-12-31', 'Holiday break', 'Nobody')]
+    cal_seq = cal.copy()
+    for date, comment, *name in sorted(skips)[:-1]:
+        cal_seq = meet.skip_date(cal_df=cal_seq, date=date, comment=comment, name=name[0] if name else 'Everyone')
+    cal_batch = meet.skip_dates(cal_df=cal, skips=skips[:-1])
+    pd.testing.assert_frame_equal(cal_batch, cal_seq)
+    # The last date can be skipped as well
+    cal_batch = meet.skip_dates(cal_df=cal, skips=skips)
+    assert cal_batch['name'].iloc[-1] == 'Nobody'
+    with pytest.raises(ValueError):
+        meet.skip_dates(cal_df=cal, skips=[('2025-02-13', 'Not a meeting')])
+
+
+def test_extend(meet):
+    """ Extending a schedule from its state continues the rotation """
+    cal = meet.create_timeboard(start_date='2025-01-01', end_date='2025-12-31', start_name=meet.name_list[1])
+    cal_first = cal.loc[cal['date'] <= '2025-06-30'].reset_index(drop=True)
+    state = ScheduleState.from_json(meet.schedule_state(cal_first).to_json())
+    cal_new, new_state = meet.extend(state, new_end_date='2025-12-31')
+    pd.testing.assert_frame_equal(cal_new, cal.loc[cal['date'] > '2025-06-30'].reset_index(drop=True))
+    assert new_state.last_date == '2025-12-31'
+    # Skipped dates keep the rotation for the next date
+    cal_skip, skip_state = meet.extend(state, new_end_date='2025-12-31', skips=[('2025-07-09', 'Retreat')])
+    cal_seq = meet.skip_date(cal_df=cal, date='2025-07-09', comment='Retreat')
+    pd.testing.assert_frame_equal(cal_skip, cal_seq.loc[cal_seq['date'] > '2025-06-30'].reset_index(drop=True))
+    assert skip_state.skips == [['2025-07-09', 'Retreat', 'Everyone']]
+    assert skip_state.cursor == (new_state.cursor - 1) % len(meet.name_list)
+    with pytest.raises(ValueError):
+        meet.extend(state, new_end_date='2025-12-31', swaps=[('2025-07-09', '2026-07-08')])
+    # A Thursday is not a meeting date, and the skips are not applied
+    with pytest.raises(ValueError, match='2025-07-10'):
+        meet.extend(state, new_end_date='2025-12-31', skips=[('2025-07-09', 'Retreat'), ('2025-07-10', 'Typo')])
+
+
+def test_extend_swapped():
+    """ The state of a calendar with swapped dates continues the rotation """
+    meet = Meetings(name_list=['A', 'B', 'C', 'D', 'E'])
+    cal = meet.create_timeboard(start_date='2025-01-01', end_date='2025-04-30', engine='numpy')
+    cal_first = cal.loc[cal['date'] <= '2025-02-26'].reset_index(drop=True)
+    cal_first = meet.swap_dates(cal_first, date_1='2025-02-26', date_2='2025-02-12')
+    cal_new, _ = meet.extend(meet.schedule_state(cal_first), new_end_date='2025-04-30')
+    pd.testing.assert_frame_equal(cal_new, cal.loc[cal['date'] > '2025-02-26'].reset_index(drop=True))
+    assert cal_first['name'].iloc[-1] != cal_new['name'].iloc[0]
+    # C, B, A, D matches the rotations from A and from C in two rows each
+    four = Meetings(name_list=['A', 'B', 'C', 'D'])
+    cal_four = four.create_timeboard(start_date='2025-01-01', end_date='2025-01-22', engine='numpy')
+    with pytest.raises(ValueError):
+        four.schedule_state(four.swap_dates(cal_four, date_1='2025-01-01', date_2='2025-01-15'))
+
+
+def test_merge_lists():
+    """ Interleave groups of unequal size """
+    list_of_lists = [['a1', 'a2', 'a3'], ['b1'], ['c1', 'c2']]
+    # Reference implementation with zip
+    merged = [name for names in zip(*list_of_lists) for name in names]
+    merged.extend([name for name in chain(*list_of_lists) if name not in merged])
+    assert Meetings.merge_lists(list_of_lists) == merged
+    assert Meetings.merge_lists(list_of_lists, fill='cycle') == ['a1', 'b1', 'c1', 'a2', 'c2', 'a3']
+    assert Meetings.merge_lists([]) == []
+
+
+def test_schedule_many():
+    """ Create schedules for several rosters in parallel """
+    specs = [{'name_list': ['Ann', 'Bob', 'Cat'], 'start_date': '2025-01-01', 'end_date': '2025-03-31',
+              'roster': 'lab'},
+             {'name_list': ['Dan', 'Eve'], 'start_date': '2025-03-31', 'end_date': '2025-01-01',
+              'roster': 'broken'},
+             {'name_list': ['Fay', 'Gus'], 'group_list': ['a', 'b'], 'start_date': '2025-01-06',
+              'end_date': '2025-02-28', 'meeting_day': 0, 'roster': 'core'},
+             {'names': ['Hal', 'Ivy'], 'start_date': '2025-01-01', 'end_date': '2025-03-31', 'roster': 'malformed'},
+             'not a spec']
+    batch = schedule_many(specs, max_workers=2)
+    assert list(batch.errors) == ['broken', 'malformed', '4']
+    assert isinstance(batch.errors['malformed'], TypeError)
+    assert batch.schedule['roster'].unique().tolist() == ['lab', 'core']
+    serial = schedule_many(specs, max_workers=1)
+    pd.testing.assert_frame_equal(batch.schedule, serial.schedule)
+    lab = Meetings(name_list=['Ann', 'Bob', 'Cat']).create_timeboard(start_date='2025-01-01', end_date='2025-03-31')
+    pd.testing.assert_frame_equal(batch.schedule.loc[batch.schedule['roster'] == 'lab', lab.columns], lab)
+
+
+def test_schedule_cache():
+    """ Repeated schedules come from the cache """
+    meet = Meetings(name_list=['Ann', 'Bob', 'Cat'], group_list=['a', 'b', 'a'], cache_size=2)
+    cal = meet.create_timeboard(start_date='2025-01-01', end_date='2025-06-30', start_name='Bob')
+    cal.loc[0, 'name'] = 'Changed'
+    cal_cached = meet.create_timeboard(start_date='2025-01-01', end_date='2025-06-30', start_name='Bob')
+    assert cal_cached.loc[0, 'name'] == 'Bob'
+    assert meet.cache_info()[:2] == (1, 1)
+    meet.create_name_sequence(name_sequence=['Cat', 'Bob', 'Ann'], merge_groups=False)
+    meet.create_timeboard(start_date='2025-01-01', end_date='2025-06-30', start_name='Bob')
+    assert meet.cache_info()[:2] == (1, 2)
+    meet.clear_cache()
+    assert meet.cache_info() == (0, 0, 2, 0)
+
+
+def test_iter_schedule(meet):
+    """ The lazy schedule has the same rows as create_timeboard """
+    start_name = meet.name_list[4]
+    cal = meet.create_timeboard(start_date='2024-12-30', end_date='2028-03-01', start_name=start_name)
+    records = takewhile(lambda record: record.date <= pd.Timestamp('2028-03-01'),
+                        meet.iter_schedule(start_date='2024-12-30', start_name=start_name))
+    cal_lazy = pd.concat(chunk_schedule(records, chunk_size=50), ignore_index=True)
+    pd.testing.assert_frame_equal(cal_lazy, cal)
+    records = list(islice(meet.iter_schedule(start_date='2025-01-01', meeting_day=7), 10))
+    assert len(records) == 1
+
+
+def test_compact(meet):
+    """ The compact layout converts back to the standard layout """
+    cal = meet.create_timeboard(start_date='2025-01-01', end_date='2027-12-31')
+    cal = meet.skip_dates(cal_df=cal, skips=[('2025-03-05', 'Retreat', 'Everyone')])
+    compact = meet.to_compact(cal)
+    assert compact['date'].dtype == 'int32'
+    assert list(compact['name'].cat.categories) == list(meet.name_df['name'].values) + ['Everyone']
+    assert compact.memory_usage(deep=True).sum() < cal.memory_usage(deep=True).sum()
+    pd.testing.assert_frame_equal(meet.from_compact(compact), cal)
+
+
+def test_swap_many(meet):
+    """ Swapping several pairs at once is the same as swapping them one at a time """
+    cal = meet.create_timeboard(start_date='2025-01-01', end_date='2025-12-31')
+    pairs = [('2025-01-01', '2025-02-05'), ('2025-02-05', '2025-11-26'), ('2025-07-02', '2025-06-25')]
+    cal_seq = cal.copy()
+    for date_1, date_2 in pairs:
+        cal_seq = meet.swap_dates(cal_df=cal_seq, date_1=date_1, date_2=date_2)
+    pd.testing.assert_frame_equal(meet.swap_many(cal_df=cal, pairs=pairs), cal_seq)
+    with pytest.raises(ValueError, match='2025-01-02, 2025-01-03'):
+        meet.swap_many(cal_df=cal, pairs=[('2025-01-03', '2025-01-08'), ('2025-01-02', '2025-01-01')])
+
+
+def test_profile(meet):
+    """ The profiler records the stages of the methods """
+    timings = []
+    with meet.profile(callback=timings.append) as profiler:
+        cal = meet.create_timeboard(start_date='2025-01-01', end_date='2025-12-31')
+        cal = meet.skip_date(cal_df=cal, date='2025-03-05', comment='Retreat')
+        meet.swap_dates(cal_df=cal, date_1='2025-01-01', date_2='2025-01-08')
+    summary = profiler.summary()
+    assert {'create_timeboard.timeboard', 'create_timeboard.to_dataframe', 'create_timeboard.merge',
+            'create_timeboard.holidays', 'create_timeboard.astype', 'skip_date.concat',
+            'swap_dates.swap'} <= set(summary['stage'])
+    assert summary.loc[summary['stage'] == 'create_timeboard.merge', 'calls'].item() == 2
+    assert len(timings) == len(profiler.report())
+    assert profiler.report()['memory_peak'].notna().all()
+    assert meet.profiler is None
+
+
+def test_optimize_sequence(meet):
+    """ The best ordering is reproducible across n_jobs and matches the schedule it creates """
+    kwargs = dict(start_date='2025-01-01', end_date='2025-12-31', n_trials=300, batch_size=64, seed=7)
+    result = meet.optimize_sequence(objective='group_adjacency', n_jobs=1, **kwargs)
+    result_parallel = meet.optimize_sequence(objective='group_adjacency', n_jobs=2, **kwargs)
+    assert result.sequence == result_parallel.sequence and result.score == result_parallel.score
+    assert sorted(result.sequence) == sorted(meet.name_list)
+    meet.create_name_sequence(name_sequence=result.sequence, merge_groups=False)
+    cal = meet.create_timeboard(start_date='2025-01-01', end_date='2025-12-31', engine='numpy')
+    assert (cal['group'].values[1:] == cal['group'].values[:-1]).sum() == result.score
+    weighted = meet.optimize_sequence(objective={'group_adjacency': 10.0, 'holiday_load': 1.0}, n_jobs=1, **kwargs)
+    assert weighted.n_trials == 301
+    with pytest.raises(ValueError):
+        meet.optimize_sequence(objective='min_gap', n_jobs=1, **kwargs)
+
+
+def test_schedule_stats(meet):
+    """ Presenter, group and holiday statistics of single and multi-roster schedules """
+    cal = meet.create_timeboard(start_date='2025-01-01', end_date='2025-12-31', engine='numpy')
+    cal = meet.skip_dates(cal, [('2025-11-26', 'Thanksgiving week')])
+    stats = schedule_stats(cal)
+    assert stats.presenters['talks'].sum() == len(cal) - 1
+    assert set(stats.presenters['min_gap_days']) == {49}
+    assert stats.presenters['mean_gap_days'].max() > 49
+    assert stats.groups['talks'].sum() == len(cal) - 1
+    assert stats.groups['presenters'].sum() == 7
+    assert stats.groups['adjacent'].sum() == (cal['group'].values[1:] == cal['group'].values[:-1]).sum() - 1
+    talks = cal.loc[cal['name'] != 'Everyone']
+    pd.testing.assert_series_equal(stats.collisions['date'], talks.loc[talks['holiday'], 'date'].reset_index(drop=True))
+    batch = schedule_many([{'name_list': ['Ann', 'Bob', 'Cat'], 'group_list': ['a', 'a', 'b'],
+                            'start_date': '2025-01-01', 'end_date': '2025-06-30', 'roster': 'lab'},
+                           {'name_list': ['Ann', 'Gus'], 'group_list': ['a', 'b'],
+                            'start_date': '2025-01-06', 'end_date': '2025-06-30', 'meeting_day': 0,
+                            'roster': 'core'}], max_workers=1)
+    stats = schedule_stats(batch.schedule, roster_col='roster')
+    assert len(stats.presenters) == 5
+    assert stats.presenters.groupby('roster')['min_gap_days'].min().to_dict() == {'core': 14, 'lab': 21}
+    assert stats.groups.groupby('roster')['talk_share'].sum().round(6).tolist() == [1.0, 1.0]
+
+
+def test_schedule_index(meet):
+    """ Lookups of the index agree with scans of the schedule, also after incremental refreshes """
+    cal = meet.create_timeboard(start_date='2025-01-01', end_date='2025-12-31', engine='numpy')
+    index = ScheduleIndex(cal)
+    name = meet.name_list[2]
+    assert index.who('2025-01-08') == cal.loc[cal['date'] == '2025-01-08', 'name'].tolist()
+    assert index.who('2025-01-09') == []
+    assert index.next(name, after='2025-06-01') == cal.loc[(cal['name'] == name) &
+                                                           (cal['date'] >= '2025-06-01'), 'date'].min()
+    assert index.next(name, after='2026-01-01') is None
+    pd.testing.assert_frame_equal(index.talks(name), cal.loc[cal['name'] == name])
+    pd.testing.assert_frame_equal(index.between('2025-03-01', '2025-03-31'),
+                                  cal.loc[cal['date'].between('2025-03-01', '2025-03-31')])
+    for cal in [meet.swap_dates(cal, '2025-02-05', '2025-09-10'),
+                meet.skip_dates(cal, [('2025-07-02', 'Summer break')]),
+                cal.iloc[:20]]:
+        index.refresh(cal)
+        rebuilt = ScheduleIndex(cal)
+        assert index.positions.keys() == rebuilt.positions.keys()
+        for nm, pos in rebuilt.positions.items():
+            assert index.positions[nm].tolist() == pos.tolist()
+
+
+def test_find_conflicts():
+    """ Talks of the same person in different series within the window """
+    lab = Meetings(name_list=['Ann', 'Bob', 'Cat']).create_timeboard(start_date='2025-01-01',
+                                                                     end_date='2025-03-31', engine='numpy')
+    core = Meetings(name_list=['Ann', 'Dan']).create_timeboard(start_date='2025-01-06', end_date='2025-03-31',
+                                                               meeting_day=0, engine='numpy')
+    club = Meetings(name_list=['Ann']).create_timeboard(start_date='2025-01-01', end_date='2025-01-31',
+                                                        meeting_day=2, engine='numpy')
+    assert find_conflicts({'lab': lab, 'core': core}).empty
+    conflicts = find_conflicts({'lab': lab, 'core': core, 'club': club}, window_days=2)
+    # Brute force comparison of all pairs of talks
+    talks = pd.concat([cal.assign(series=key) for key, cal in {'lab': lab, 'core': core, 'club': club}.items()])
+    pairs = talks.merge(talks, on='name', suffixes=('_1', '_2'))
+    pairs = pairs.loc[(pairs['series_1'] != pairs['series_2']) & (pairs['date_1'] <= pairs['date_2']) &
+                      ((pairs['date_2'] - pairs['date_1']).dt.days <= 2)]
+    assert len(conflicts) == len(pairs) - (pairs['date_1'] == pairs['date_2']).sum() // 2
+    assert (conflicts['name'] == 'Ann').all() and conflicts['days_apart'].between(0, 2).all()
+    batch = pd.concat([lab.assign(roster='lab'), club.assign(roster='club')], ignore_index=True)
+    same_day = find_conflicts(batch)
+    assert same_day[['series_1', 'series_2']].drop_duplicates().shape[0] == 1
+    assert (same_day['date_1'] == same_day['date_2']).all() and len(same_day) > 0
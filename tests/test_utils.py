@@ -4,7 +4,91 @@ __author__ = "Andreas Werdich"
 __copyright__ = "Core for Computational Biomedicine at Harvard Medical School"
 __license__ = "CC0-1.0"
 
-from cadence.utils import GroupFaker
+import gzip
+import hashlib
+import os
+import tarfile
+import threading
+import time
+import zipfile
+import numpy as np
+import pandas as pd
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from tempfile import TemporaryDirectory
+import pytest
+from cadence.utils import COMPRESSED_OPENERS, DownloadCache, FileOP, GroupFaker, load_roster
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    """ Request handler without log messages, with support for Range and If-Range requests """
+    ranges = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def etag(self):
+        """ ETag from the content of the requested file """
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path):
+            return None
+        with open(path, 'rb') as fl:
+            return f'"{hashlib.sha256(fl.read()).hexdigest()[:16]}"'
+
+    def end_headers(self):
+        etag = self.etag()
+        if etag is not None:
+            self.send_header('ETag', etag)
+        super().end_headers()
+
+    def do_HEAD(self):
+        # Servers that do not allow HEAD are simulated with a query
+        if 'nohead' in self.path:
+            self.send_error(405)
+        else:
+            super().do_HEAD()
+
+    def do_GET(self):
+        if self.headers.get('If-None-Match') is not None and self.headers.get('If-None-Match') == self.etag():
+            self.send_response(304)
+            self.end_headers()
+            return None
+        range_header = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        if range_header is None or (if_range is not None and if_range != self.etag()):
+            return super().do_GET()
+        self.ranges.append(range_header)
+        with open(self.translate_path(self.path), 'rb') as fl:
+            data = fl.read()
+        start = int(range_header.split('=')[1].split('-')[0])
+        # Servers that send the wrong part of the file are simulated with a query
+        if 'badrange' in self.path:
+            start = 0
+        self.send_response(206)
+        self.send_header('Content-Range', f'bytes {start}-{len(data) - 1}/{len(data)}')
+        self.send_header('Content-Length', str(len(data) - start))
+        self.end_headers()
+        self.wfile.write(data[start:])
+
+
+@pytest.fixture
+def http_server():
+    """
+    Local HTTP server with a .csv and a .csv.gz file
+    :return: base URL and directory of the served files
+    """
+    with TemporaryDirectory() as serve_dir:
+        with open(os.path.join(serve_dir, 'members.csv'), 'w') as fl:
+            fl.write('name,group\nAnn,a\nBob,b\n')
+        with gzip.open(os.path.join(serve_dir, 'schedule.csv.gz'), 'wt') as fl:
+            fl.write('date,name\n2025-01-01,Ann\n')
+        server = ThreadingHTTPServer(('127.0.0.1', 0), partial(QuietHandler, directory=serve_dir))
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f'http://127.0.0.1:{server.server_port}', serve_dir
+        server.shutdown()
+        server.server_close()
+
 
 def test_group_faker():
     """
@@ -16,4 +100,203 @@ def test_group_faker():
     gf = GroupFaker(n_members=n_members,
                     n_groups=n_groups)
     my_group = gf.create_fake_research_group()
-    assert my_group.shape == (n_members, 4)
\ No newline at end of file
+    assert my_group.shape == (n_members, 4)
+
+
+def test_bulk_group_faker():
+    gf = GroupFaker(n_members=5000, n_groups=7)
+    bulk = gf.create_bulk_research_group()
+    assert list(bulk.columns) == list(gf.create_fake_research_group().columns)
+    assert bulk.shape == (5000, 4)
+    assert (bulk['name'] == bulk['first_name'] + ' ' + bulk['last_name']).all()
+    assert bulk.groupby('name')['group'].nunique().max() == 1
+    sizes = bulk.drop_duplicates('name')['group'].value_counts()
+    assert len(sizes) == 7 and sizes.max() - sizes.min() <= 1
+    pd.testing.assert_frame_equal(bulk, GroupFaker(n_members=5000, n_groups=7).create_bulk_research_group())
+    members = ['Ann', 'Bob', 'Cy']
+    gf.make_random_groups(members)
+    assert members == ['Ann', 'Bob', 'Cy']
+
+
+def test_download_many(http_server):
+    """ Download several files concurrently from a local server """
+    url_base, _ = http_server
+    urls = [f'{url_base}/members.csv', f'{url_base}/missing.csv', f'{url_base}/schedule.csv.gz']
+    with TemporaryDirectory() as download_dir:
+        results = FileOP().download_many(urls, download_dir=download_dir, ext_list=['.csv.gz', '.csv'],
+                                         max_workers=3)
+        assert [result.url for result in results] == urls
+        assert [os.path.basename(result.file) for result in (results[0], results[2])] == ['members.csv',
+                                                                                          'schedule.csv']
+        assert results[1].file is None and results[1].error is not None
+        with open(results[2].file) as fl:
+            assert fl.read() == 'date,name\n2025-01-01,Ann\n'
+
+
+def test_download_cache(http_server):
+    """ Cached files are revalidated and refreshed when they change on the server """
+    url_base, serve_dir = http_server
+    url = f'{url_base}/members.csv'
+    with TemporaryDirectory() as download_dir:
+        cache = DownloadCache(cache_dir=download_dir)
+        file = FileOP().download_from_url(url=url, download_dir=download_dir, cache=cache)
+        assert cache.request_headers(url, file).get('If-Modified-Since') is not None
+        assert not FileOP().download(url, output_file=file, cache=cache)
+        # Update the file on the server
+        served_file = os.path.join(serve_dir, 'members.csv')
+        with open(served_file, 'a') as fl:
+            fl.write('Cat,a\n')
+        os.utime(served_file, (time.time() + 10, time.time() + 10))
+        assert FileOP().download(url, output_file=file, cache=DownloadCache(cache_dir=download_dir))
+        with open(file) as fl:
+            assert fl.read().endswith('Cat,a\n')
+        # The least recently used file is evicted
+        small_cache = DownloadCache(cache_dir=download_dir, max_bytes=30)
+        FileOP().download(f'{url_base}/schedule.csv.gz', output_file=os.path.join(download_dir, 'schedule.csv.gz'),
+                          cache=small_cache)
+        assert list(small_cache.index) == [f'{url_base}/schedule.csv.gz']
+        assert not os.path.exists(file)
+
+
+def test_file_sizes_from_urls(http_server):
+    base_url, serve_dir = http_server
+    members_size = os.path.getsize(os.path.join(serve_dir, 'members.csv'))
+    urls = [f'{base_url}/members.csv', f'{base_url}/missing.csv', f'{base_url}/members.csv?nohead=1']
+    results = FileOP().file_sizes_from_urls(urls, connections_per_host=2)
+    assert [result.url for result in results] == urls
+    assert results[0].size == members_size and results[0].error is None
+    assert results[1].size is None and results[1].error.code == 404
+    assert results[2].size == members_size and results[2].error is None
+    assert FileOP().file_size_from_url(urls[0]) == members_size
+    assert np.isnan(FileOP().file_size_from_url(urls[1]))
+
+
+
+def test_file_sizes_bad_url(http_server):
+    """ A URL that cannot be requested fails without stopping the batch """
+    base_url, serve_dir = http_server
+    members_size = os.path.getsize(os.path.join(serve_dir, 'members.csv'))
+    urls = [f'{base_url}/members.csv', 'file:///tmp/members.csv', 'notaurl', f'{base_url}/members.csv']
+    results = FileOP().file_sizes_from_urls(urls)
+    assert [result.size for result in results] == [members_size, None, None, members_size]
+    assert [result.error is None for result in results] == [True, False, False, True]
+    assert isinstance(results[1].error, ValueError)
+    assert np.isnan(FileOP().file_size_from_url('file:///x')) and np.isnan(FileOP().file_size_from_url('notaurl'))
+
+
+def test_load_roster():
+    raw = pd.DataFrame({'Name': ['bob smith', 'ann LEE', 'cy ray'],
+                        'Email': ['Bob@X.org', 'ANN@x.org', 'cy@x.org'],
+                        'Group': ['B', 'A', 'a']})
+    with TemporaryDirectory() as data_dir:
+        member_file = os.path.join(data_dir, 'members.xlsx')
+        raw.to_excel(member_file, index=False)
+        roster = load_roster(member_file)
+        assert list(roster.columns) == ['name', 'email', 'group']
+        assert roster['name'].tolist() == ['Ann Lee', 'Cy Ray', 'Bob Smith']
+        assert roster['email'].tolist() == ['ann@x.org', 'cy@x.org', 'bob@x.org']
+        assert roster['group'].tolist() == ['a', 'a', 'b']
+        snapshots = [fl for fl in os.listdir(data_dir) if fl.endswith('.parquet')]
+        assert len(snapshots) == 1
+        # The snapshot is used until the workbook changes
+        pd.testing.assert_frame_equal(load_roster(member_file), roster)
+        raw.iloc[:2].to_excel(member_file, index=False)
+        assert len(load_roster(member_file)) == 2
+        snapshots_new = [fl for fl in os.listdir(data_dir) if fl.endswith('.parquet')]
+        assert len(snapshots_new) == 1 and snapshots_new != snapshots
+
+
+def interrupt_fetch(url, output_file, n_bytes):
+    """ Starts a download that is interrupted after n_bytes, which leaves a .part file """
+    def reporthook(block_number, block_size, total_size):
+        if block_size >= n_bytes:
+            raise ConnectionError('Interrupted')
+    with pytest.raises(ConnectionError):
+        FileOP().fetch(url, output_file=output_file, reporthook=reporthook, chunk_size=n_bytes)
+    assert os.path.getsize(f'{output_file}.part') == n_bytes
+
+
+def test_resume_download(http_server):
+    """ An interrupted download is resumed from the .part file """
+    url_base, serve_dir = http_server
+    url = f'{url_base}/members.csv'
+    with open(os.path.join(serve_dir, 'members.csv'), 'rb') as fl:
+        data = fl.read()
+    with TemporaryDirectory() as download_dir:
+        output_file = os.path.join(download_dir, 'members.csv')
+        interrupt_fetch(url, output_file, n_bytes=10)
+        result = FileOP().fetch(url, output_file=output_file, sha256=hashlib.sha256(data).hexdigest())
+        assert QuietHandler.ranges[-1] == 'bytes=10-'
+        assert result.size == len(data)
+        assert not os.path.exists(f'{output_file}.part')
+        with open(output_file, 'rb') as fl:
+            assert fl.read() == data
+        with pytest.raises(ValueError):
+            FileOP().fetch(url, output_file=os.path.join(download_dir, 'other.csv'), sha256='0' * 64)
+        assert os.listdir(download_dir) == ['members.csv']
+
+
+def test_resume_changed_file(http_server):
+    """ A .part file is not resumed if the file changed on the server or the server sends the wrong range """
+    url_base, serve_dir = http_server
+    with TemporaryDirectory() as download_dir:
+        output_file = os.path.join(download_dir, 'members.csv')
+        interrupt_fetch(f'{url_base}/members.csv', output_file, n_bytes=10)
+        new_data = b'name,group\nCyd,c\nDee,d\nEli,e\n'
+        with open(os.path.join(serve_dir, 'members.csv'), 'wb') as fl:
+            fl.write(new_data)
+        n_ranges = len(QuietHandler.ranges)
+        result = FileOP().fetch(f'{url_base}/members.csv', output_file=output_file)
+        # The server ignores the range of the old version and sends the new file
+        assert len(QuietHandler.ranges) == n_ranges
+        assert result.sha256 == hashlib.sha256(new_data).hexdigest()
+        with open(output_file, 'rb') as fl:
+            assert fl.read() == new_data
+        output_file = os.path.join(download_dir, 'bad.csv')
+        interrupt_fetch(f'{url_base}/members.csv?badrange=1', output_file, n_bytes=10)
+        result = FileOP().fetch(f'{url_base}/members.csv?badrange=1', output_file=output_file)
+        assert result.sha256 == hashlib.sha256(new_data).hexdigest()
+        assert sorted(os.listdir(download_dir)) == ['bad.csv', 'members.csv']
+
+
+@pytest.mark.parametrize('file_name', ['members.csv.gz', 'members.csv.bz2', 'members.csv.xz', 'members.zip',
+                                       'members.tar.gz'])
+def test_stream_extract(http_server, file_name):
+    """ Decompress files while downloading them and read them without writing to disk """
+    url_base, serve_dir = http_server
+    members_file = os.path.join(serve_dir, 'members.csv')
+    with open(members_file, 'rb') as fl:
+        data = fl.read()
+    archive_file = os.path.join(serve_dir, file_name)
+    if file_name.endswith('.zip'):
+        with zipfile.ZipFile(archive_file, 'w') as zf:
+            zf.write(members_file, arcname='members.csv')
+    elif file_name.endswith('.tar.gz'):
+        with tarfile.open(archive_file, 'w:gz') as tar:
+            tar.add(members_file, arcname='members.csv')
+    else:
+        with COMPRESSED_OPENERS[os.path.splitext(file_name)[-1]](archive_file, 'wb') as fl:
+            fl.write(data)
+    url = f'{url_base}/{file_name}'
+    with TemporaryDirectory() as download_dir:
+        output_path = FileOP().stream_extract(url, download_dir=download_dir)
+        # Archives are extracted into a directory, compressed files into a file
+        expected = 'members' if file_name in ['members.zip', 'members.tar.gz'] else 'members.csv'
+        assert os.listdir(download_dir) == [expected]
+        if os.path.isdir(output_path):
+            output_path = os.path.join(output_path, 'members.csv')
+        with open(output_path, 'rb') as fl:
+            assert fl.read() == data
+    if not file_name.endswith('.tar.gz'):
+        members = FileOP().read_url(url)
+        assert members['name'].tolist() == ['Ann', 'Bob']
+
+
+def test_stream_extract_corrupt_zip(http_server):
+    """ A .zip file that cannot be extracted is kept """
+    url_base, serve_dir = http_server
+    with open(os.path.join(serve_dir, 'broken.zip'), 'wb') as fl:
+        fl.write(b'not a zip file')
+    with TemporaryDirectory() as download_dir:
+        assert FileOP().stream_extract(f'{url_base}/broken.zip', download_dir=download_dir) is None
+        assert os.listdir(download_dir) == ['broken.zip']